@@ -0,0 +1,61 @@
+"""异步客户端复用池 - 在节点调用之间复用HTTP/LLM客户端
+
+客户端的连接池绑定在创建它的事件循环上，因此按事件循环分别缓存；
+事件循环关闭后，其下的客户端无法再使用或正常关闭，会从池中移除。
+"""
+
+import asyncio
+import atexit
+import importlib.util
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# 安装了h2时启用HTTP/2连接复用 (httpx的http2=True依赖h2)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class ClientPool:
+    """按 (事件循环, 键) 缓存异步客户端"""
+
+    def __init__(self, name: str, close: Callable[[Any], Awaitable[None]]):
+        self.name = name
+        self._close = close
+        self._clients: Dict[asyncio.AbstractEventLoop, Dict[Hashable, Any]] = {}
+        atexit.register(self.close_all)
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """获取当前事件循环下键对应的客户端，不存在时用 factory 创建"""
+        loop = asyncio.get_running_loop()
+        self._prune_closed_loops()
+
+        clients = self._clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = factory()
+            clients[key] = client
+
+        return client
+
+    def __len__(self) -> int:
+        return sum(len(clients) for clients in self._clients.values())
+
+    def _prune_closed_loops(self) -> None:
+        """移除已关闭事件循环下的客户端 (其连接已随事件循环失效)"""
+        for loop in [loop for loop in self._clients if loop.is_closed()]:
+            stale = self._clients.pop(loop)
+            logger.debug("移除已关闭事件循环的客户端", pool=self.name, count=len(stale))
+
+    def close_all(self) -> None:
+        """关闭仍可用的事件循环上的客户端，并清空缓存 (进程退出时调用)"""
+        for loop, clients in self._clients.items():
+            if loop.is_closed() or loop.is_running():
+                # 已关闭的事件循环无法再驱动关闭流程；运行中的事件循环不能重入
+                continue
+            for client in clients.values():
+                try:
+                    loop.run_until_complete(self._close(client))
+                except Exception as e:
+                    logger.warning("关闭客户端失败", pool=self.name, error=str(e))
+        self._clients.clear()
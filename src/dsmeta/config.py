@@ -17,6 +17,10 @@ class SearchConfig(BaseModel):
     api_key: Optional[str] = Field(None, description="搜索API密钥")
     max_results: int = Field(10, description="最大搜索结果数")
     timeout: int = Field(30, description="搜索超时时间（秒）")
+    max_concurrency: int = Field(3, description="最大并发搜索请求数")
+    max_retries: int = Field(3, description="单个搜索请求的最大尝试次数")
+    bm25_threshold: int = Field(8, description="去重后结果数达到该值时改用BM25排序 (最多3个查询、每个最多5条结果)")
+    transport: str = Field("httpx", description="HTTP传输后端: httpx 或 aiohttp (需安装httpx-aiohttp)")
 
 
 class OutputConfig(BaseModel):
@@ -52,6 +56,7 @@ class QualityControlConfig(BaseModel):
     require_human_review_threshold: float = Field(0.5, description="需要人工审核的阈值")
     required_fields: List[str] = Field(["name", "description", "modality"], description="必需字段列表")
     enum_validation: bool = Field(True, description="启用枚举值验证")
+    pydantic_validation: bool = Field(True, description="启用Pydantic模型验证 (吞吐优先时可关闭)")
 
 
 class Config(BaseModel):
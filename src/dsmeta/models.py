@@ -233,6 +233,7 @@ class LLMConfig(BaseModel):
     api_key: str = Field(..., description="API key")
     temperature: float = Field(0.1, description="Temperature")
     max_tokens: int = Field(4000, description="Max tokens")
+    input_token_budget: int = Field(24000, description="Estimated input token budget for prompts")
     timeout: int = Field(60, description="Request timeout")
 
 
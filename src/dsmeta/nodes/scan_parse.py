@@ -7,7 +7,7 @@ from typing import Dict, Any
 import structlog
 
 from ..models import DatasetState, FileStat, ProcessingStatus
-from ..parsers import parse_dataset_documents
+from ..parsers import parse_dataset_documents_async
 
 logger = structlog.get_logger(__name__)
 
@@ -55,7 +55,7 @@ async def scan_and_parse(state: DatasetState) -> Dict[str, Any]:
         
         # Parse dataset documentation for real information
         logger.info("解析数据集文档", processing_id=state.processing_id)
-        doc_info = parse_dataset_documents(state.dataset_path)
+        doc_info = await parse_dataset_documents_async(state.dataset_path)
         
         # Generate cache key
         cache_key = _generate_cache_key(state.dataset_path, total_size)
@@ -3,15 +3,132 @@
 import asyncio
 import json
 import re
-from typing import Dict, Any, List, Optional
+import time
+from typing import Dict, Any, List, Optional, Tuple
 import structlog
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
-from ..models import DatasetState
+from ..models import (
+    DatasetState, DataModality, UseCase, Domain, BusinessDirection, BusinessPoint, Rating, PIIRisk
+)
 from ..config import Config
+from ..client_pool import ClientPool, HTTP2_AVAILABLE
 
 logger = structlog.get_logger(__name__)
 
+# 文件名语言检测用的字符类
+_CHINESE_RE = re.compile(r'[\u4e00-\u9fff]')
+_ENGLISH_RE = re.compile(r'[a-zA-Z]')
+
+# 需要校验的单选枚举字段及其合法取值
+_ENUM_VALIDATIONS = (
+    ("modality", frozenset(e.value for e in DataModality)),
+    ("use_case", frozenset(e.value for e in UseCase)),
+    ("domain", frozenset(e.value for e in Domain)),
+    ("rating", frozenset(e.value for e in Rating)),
+    ("pii_risk", frozenset(e.value for e in PIIRisk))
+)
+
+# 可选的枚举字段 (支持多选)
+_OPTIONAL_ENUM_VALIDATIONS = (
+    ("business_direction", frozenset(e.value for e in BusinessDirection)),
+    ("business_point", frozenset(e.value for e in BusinessPoint))
+)
+
+# 记录数估算: 扩展名 -> 估算规则编号
+_RECORD_EXT_IDS = {"json": 0, "jsonl": 0, "csv": 1, "txt": 2}
+
+# 按规则编号索引的估算函数 (size_bytes, lines) -> 记录数
+_RECORD_ESTIMATORS = (
+    lambda size, lines: max(1, size // 500),   # JSON: 假设平均每条记录500字节
+    lambda size, lines: max(0, lines - 1),     # CSV: 减去标题行
+    lambda size, lines: max(1, lines // 10),   # 文本: 假设10行为一条记录
+)
+
+
+# 复用的LLM客户端，按事件循环和 (api_key, base_url, timeout) 缓存
+_LLM_CLIENTS = ClientPool("llm", lambda client: client.close())
+
+
+# 综合分析提示词的静态部分，仅在模块加载时构建一次
+_SYNTHESIS_SYSTEM_PROMPT = "你是一个专业的数据集分析专家。请仔细分析提供的信息，生成准确完整的数据集元数据。输出必须是有效的JSON格式。"
+
+_SYNTHESIS_PROMPT_HEADER = """你是一个专业的数据集分析专家，需要综合分析本地文件扫描结果和网页搜索结果，生成完整的数据集元数据。
+
+## 数据集基本信息
+- 数据集名称: {dataset_name}
+- 文件总数: {num_files}
+- 总大小: {total_size}
+
+## 本地分析结果
+{preliminary}
+
+## 数据集内部文档信息
+{doc_info}
+
+## 网页搜索结果
+"""
+
+_SEARCH_RESULT_TEMPLATE = """
+### 搜索结果 {index}
+- 标题: {title}
+- URL: {url}
+- 摘要: {snippet}...
+- 相关性得分: {relevance_score}
+"""
+
+_NO_SEARCH_RESULTS = "（未找到相关搜索结果）"
+
+# 嵌入提示词的分析结果中单个字符串/列表的长度上限
+_PROMPT_MAX_STRING_CHARS = 1000
+_PROMPT_MAX_LIST_ITEMS = 20
+
+_SYNTHESIS_TASK_SUFFIX = """
+
+## 任务要求
+请基于上述信息，生成完整的数据集元数据。**特别注意**：
+
+1. **优先使用内部文档信息**: 如果数据集内部文档提供了真实信息（如description、source_url等），必须以此为准
+2. **智能扩展补充**: 对于文档中较简单的信息（如只有一个business_point），应基于数据集特性和领域知识进行合理扩展
+3. **信息融合**: 综合本地分析、文档信息和搜索结果，生成完整准确的元数据
+4. **质量保证**: 确保所有信息的一致性和准确性
+
+**信息优先级**：内部文档 > 网页搜索结果 > 本地分析推测
+
+## 输出格式
+请严格按照以下JSON格式输出，不要包含其他内容：
+
+```json
+{
+  "name": "数据集官方名称",
+  "description": "数据集详细描述(100-200字)",
+  "source": "来源平台名称(如GitHub/HuggingFace/Kaggle等)",
+  "source_url": "官方仓库或下载链接",
+  "modality": "数据模态(自然语言文本/代码/流量/日志/结构化/表格/二进制/图像/音频/视频/多模态)",
+  "use_case": "主要用途(模型预训练/模型微调/模型微调(含思维链)/模型评测/强化学习/分类/回归/实体识别/数据分析/混合用途)",
+  "domain": "专业领域(基础通用/网络攻防/安全认知/体系化防御)",
+  "business_direction": ["业务方向数组(可多选，如：代码分析、工具生成、情报分析等)"],
+  "business_point": ["业务场景数组(可多选，如：代码辅助生成、工具测试、目标分析等)"],
+  "rating": "专业评级(基础/进阶/高级/专用私有)",
+  "license": "许可证信息(如MIT/Apache-2.0/CC-BY-4.0等，如未知填null)",
+  "citation": "引用格式(BibTeX或文本格式，如未知填null)",
+  "task_types": ["具体任务类型列表"],
+  "pii_risk": "隐私风险评估(none/low/medium/high)",
+  "quality_notes": "数据质量说明(可选)",
+  "confidence_score": 0.85,
+  "reasoning": "分析推理过程简述"
+}
+```
+
+请确保：
+- 所有字段都要填写，不能遗漏
+- 枚举字段必须使用指定的选项值
+- business_direction和business_point是数组字段，可以包含多个值
+- task_types是数组，可包含多个具体任务类型
+- confidence_score为0-1之间的浮点数
+- 如果搜索结果与本地分析冲突，优先采用搜索结果中的权威信息
+"""
+
 
 async def synthesize_and_populate(state, config: Optional[Config] = None) -> Dict[str, Any]:
     """
@@ -37,15 +154,16 @@ async def synthesize_and_populate(state, config: Optional[Config] = None) -> Dic
         files = _get_state_value(state, "files", [])
         total_size = _get_state_value(state, "total_size", 0)
         
-        logger.info("开始综合分析与填充",
-                   processing_id=processing_id,
-                   dataset_name=dataset_name,
-                   has_search_results=len(web_search) > 0,
-                   search_results_count=len(web_search))
+        # 绑定一次请求上下文，后续日志复用
+        log = logger.bind(processing_id=processing_id, dataset_name=dataset_name)
+        
+        log.info("开始综合分析与填充",
+                has_search_results=len(web_search) > 0,
+                search_results_count=len(web_search))
         
         # 检查是否需要使用LLM进行综合分析
         if config.llm.api_key in ["test-key-for-testing", "mock-api-key"]:
-            logger.info("使用模拟综合分析")
+            log.info("使用模拟综合分析")
             return await _generate_mock_synthesis(state)
         
         # 获取文档信息
@@ -56,24 +174,29 @@ async def synthesize_and_populate(state, config: Optional[Config] = None) -> Dic
             dataset_name, preliminary, web_search, files, total_size, doc_info
         )
         
+        estimated_tokens = _estimate_prompt_tokens(synthesis_prompt)
+        if estimated_tokens > config.llm.input_token_budget:
+            log.warning("综合分析提示词超出输入token预算",
+                       estimated_tokens=estimated_tokens,
+                       input_token_budget=config.llm.input_token_budget)
+        
         # 调用LLM进行综合分析
-        synthesis_result = await _call_llm_for_synthesis(synthesis_prompt, config)
+        synthesis_result = await _call_llm_for_synthesis(synthesis_prompt, config, log)
         
         if not synthesis_result:
-            logger.warning("LLM综合分析失败，使用本地分析结果")
+            log.warning("LLM综合分析失败，使用本地分析结果")
             synthesis_result = _fallback_to_preliminary(preliminary, web_search, dataset_name)
         
         # 补充本地统计数据
         complete_meta = _supplement_with_local_data(
-            synthesis_result, files, total_size, state
+            synthesis_result, files, total_size, state, log
         )
         
-        logger.info("综合分析完成",
-                   processing_id=processing_id,
-                   filled_fields=len(complete_meta),
-                   has_source_url=bool(complete_meta.get("source_url")),
-                   has_license=bool(complete_meta.get("license")),
-                   has_citation=bool(complete_meta.get("citation")))
+        log.info("综合分析完成",
+                filled_fields=len(complete_meta),
+                has_source_url=bool(complete_meta.get("source_url")),
+                has_license=bool(complete_meta.get("license")),
+                has_citation=bool(complete_meta.get("citation")))
         
         return {
             "current_step": "synthesize_and_populate",
@@ -127,81 +250,52 @@ def _build_synthesis_prompt(
 ) -> str:
     """构建综合分析的提示词."""
     
-    prompt = f"""你是一个专业的数据集分析专家，需要综合分析本地文件扫描结果和网页搜索结果，生成完整的数据集元数据。
-
-## 数据集基本信息
-- 数据集名称: {dataset_name}
-- 文件总数: {len(files)}
-- 总大小: {_format_size(total_size)}
-
-## 本地分析结果
-{json.dumps(preliminary, ensure_ascii=False, indent=2)}
-
-## 数据集内部文档信息
-{_format_doc_info_for_prompt(doc_info)}
-
-## 网页搜索结果
-"""
+    header = _SYNTHESIS_PROMPT_HEADER.format(
+        dataset_name=dataset_name,
+        num_files=len(files),
+        total_size=_format_size(total_size),
+        preliminary=json.dumps(_truncate_for_prompt(preliminary), ensure_ascii=False, indent=2),
+        doc_info=_format_doc_info_for_prompt(doc_info)
+    )
     
     if web_search:
-        for i, result in enumerate(web_search[:5], 1):  # 限制搜索结果数量
-            prompt += f"""
-### 搜索结果 {i}
-- 标题: {result.get('title', '')}
-- URL: {result.get('url', '')}
-- 摘要: {result.get('snippet', '')[:200]}...
-- 相关性得分: {result.get('relevance_score', 0)}
-"""
+        search_section = "".join(
+            _SEARCH_RESULT_TEMPLATE.format(
+                index=i,
+                title=result.get('title', ''),
+                url=result.get('url', ''),
+                snippet=result.get('snippet', '')[:200],
+                relevance_score=result.get('relevance_score', 0)
+            )
+            for i, result in enumerate(web_search[:5], 1)  # 限制搜索结果数量
+        )
     else:
-        prompt += "（未找到相关搜索结果）"
+        search_section = _NO_SEARCH_RESULTS
     
-    prompt += """
+    return "".join((header, search_section, _SYNTHESIS_TASK_SUFFIX))
 
-## 任务要求
-请基于上述信息，生成完整的数据集元数据。**特别注意**：
 
-1. **优先使用内部文档信息**: 如果数据集内部文档提供了真实信息（如description、source_url等），必须以此为准
-2. **智能扩展补充**: 对于文档中较简单的信息（如只有一个business_point），应基于数据集特性和领域知识进行合理扩展
-3. **信息融合**: 综合本地分析、文档信息和搜索结果，生成完整准确的元数据
-4. **质量保证**: 确保所有信息的一致性和准确性
-
-**信息优先级**：内部文档 > 网页搜索结果 > 本地分析推测
-
-## 输出格式
-请严格按照以下JSON格式输出，不要包含其他内容：
+def _truncate_for_prompt(
+    obj: Any,
+    max_chars: int = _PROMPT_MAX_STRING_CHARS,
+    max_items: int = _PROMPT_MAX_LIST_ITEMS
+) -> Any:
+    """递归截断过长的字符串和列表，控制提示词长度."""
+    if isinstance(obj, dict):
+        return {k: _truncate_for_prompt(v, max_chars, max_items) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        items = [_truncate_for_prompt(v, max_chars, max_items) for v in obj[:max_items]]
+        if len(obj) > max_items:
+            items.append(f"...(+{len(obj) - max_items} more)")
+        return items
+    if isinstance(obj, str) and len(obj) > max_chars:
+        return obj[:max_chars] + "...[truncated]"
+    return obj
 
-```json
-{
-  "name": "数据集官方名称",
-  "description": "数据集详细描述(100-200字)",
-  "source": "来源平台名称(如GitHub/HuggingFace/Kaggle等)",
-  "source_url": "官方仓库或下载链接",
-  "modality": "数据模态(自然语言文本/代码/流量/日志/结构化/表格/二进制/图像/音频/视频/多模态)",
-  "use_case": "主要用途(模型预训练/模型微调/模型微调(含思维链)/模型评测/强化学习/分类/回归/实体识别/数据分析/混合用途)",
-  "domain": "专业领域(基础通用/网络攻防/安全认知/体系化防御)",
-  "business_direction": ["业务方向数组(可多选，如：代码分析、工具生成、情报分析等)"],
-  "business_point": ["业务场景数组(可多选，如：代码辅助生成、工具测试、目标分析等)"],
-  "rating": "专业评级(基础/进阶/高级/专用私有)",
-  "license": "许可证信息(如MIT/Apache-2.0/CC-BY-4.0等，如未知填null)",
-  "citation": "引用格式(BibTeX或文本格式，如未知填null)",
-  "task_types": ["具体任务类型列表"],
-  "pii_risk": "隐私风险评估(none/low/medium/high)",
-  "quality_notes": "数据质量说明(可选)",
-  "confidence_score": 0.85,
-  "reasoning": "分析推理过程简述"
-}
-```
 
-请确保：
-- 所有字段都要填写，不能遗漏
-- 枚举字段必须使用指定的选项值
-- business_direction和business_point是数组字段，可以包含多个值
-- task_types是数组，可包含多个具体任务类型
-- confidence_score为0-1之间的浮点数
-- 如果搜索结果与本地分析冲突，优先采用搜索结果中的权威信息
-"""
-    
-    return prompt
+def _estimate_prompt_tokens(prompt: str) -> int:
+    """粗略估算提示词的token数 (中文约1字1token，英文约3-4字节1token)."""
+    return len(prompt.encode('utf-8')) // 3
 
 
 def _format_doc_info_for_prompt(doc_info: Dict[str, Any]) -> str:
@@ -247,55 +341,87 @@ def _format_doc_info_for_prompt(doc_info: Dict[str, Any]) -> str:
     return formatted
 
 
-async def _call_llm_for_synthesis(prompt: str, config: Config) -> Optional[Dict[str, Any]]:
+def _get_llm_client(api_key: str, base_url: str, timeout: int) -> AsyncOpenAI:
+    """获取可复用的LLM客户端，避免每次调用重建连接池和TLS握手."""
+    def create() -> AsyncOpenAI:
+        # 沿用openai默认的连接上限和重定向等设置，仅额外开启HTTP/2并指定超时
+        http_client = DefaultAsyncHttpxClient(http2=HTTP2_AVAILABLE, timeout=timeout)
+        return AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout,
+            http_client=http_client
+        )
+    
+    return _LLM_CLIENTS.get((api_key, base_url, timeout), create)
+
+
+async def _call_llm_for_synthesis(prompt: str, config: Config, log=logger) -> Optional[Dict[str, Any]]:
     """调用LLM进行综合分析."""
-    client = AsyncOpenAI(
-        api_key=config.llm.api_key,
-        base_url=config.llm.base_url,
-        timeout=config.llm.timeout
-    )
+    client = _get_llm_client(config.llm.api_key, config.llm.base_url, config.llm.timeout)
     
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            logger.info("调用LLM进行综合分析", attempt=attempt + 1)
+            log.info("调用LLM进行综合分析", attempt=attempt + 1)
             
-            response = await client.chat.completions.create(
+            started_at = time.perf_counter()
+            stream = await client.chat.completions.create(
                 model=config.llm.model,
                 messages=[
                     {
                         "role": "system", 
-                        "content": "你是一个专业的数据集分析专家。请仔细分析提供的信息，生成准确完整的数据集元数据。输出必须是有效的JSON格式。"
+                        "content": _SYNTHESIS_SYSTEM_PROMPT
                     },
                     {"role": "user", "content": prompt}
                 ],
                 temperature=config.llm.temperature,
                 max_tokens=config.llm.max_tokens,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                stream=True
             )
             
-            content = response.choices[0].message.content.strip()
-            logger.debug("LLM综合分析响应", content_length=len(content))
+            # 流式接收响应，边生成边拼接
+            parts = []
+            first_token_at = None
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    parts.append(delta)
+            
+            content = "".join(parts).strip()
+            elapsed = time.perf_counter() - started_at
+            
+            # 每个增量片段约为一个token
+            log.debug("LLM综合分析响应",
+                     content_length=len(content),
+                     time_to_first_token=round(first_token_at - started_at, 3) if first_token_at else None,
+                     elapsed=round(elapsed, 3),
+                     tokens_per_sec=round(len(parts) / elapsed, 1) if elapsed > 0 else None)
             
             # 解析JSON响应
             result = _parse_llm_synthesis_response(content)
             
             if result:
-                logger.info("LLM综合分析成功")
+                log.info("LLM综合分析成功")
                 return result
             else:
-                logger.warning("LLM响应解析失败", attempt=attempt + 1)
+                log.warning("LLM响应解析失败", attempt=attempt + 1)
                 
         except Exception as e:
-            logger.warning("LLM综合分析失败", 
-                          attempt=attempt + 1,
-                          error=str(e))
+            log.warning("LLM综合分析失败", 
+                       attempt=attempt + 1,
+                       error=str(e))
             
             if attempt < max_retries - 1:
                 # 指数退避重试
                 await asyncio.sleep(2 ** attempt)
     
-    logger.error("所有LLM综合分析重试均失败")
+    log.error("所有LLM综合分析重试均失败")
     return None
 
 
@@ -343,21 +469,10 @@ def _parse_llm_synthesis_response(content: str) -> Optional[Dict[str, Any]]:
 
 def _validate_enum_values(result: Dict[str, Any]) -> bool:
     """验证枚举字段的值是否有效."""
-    from ..models import DataModality, UseCase, Domain, BusinessDirection, BusinessPoint, Rating, PIIRisk
-    
-    enum_validations = [
-        ("modality", DataModality),
-        ("use_case", UseCase), 
-        ("domain", Domain),
-        ("rating", Rating),
-        ("pii_risk", PIIRisk)
-    ]
-    
-    for field, enum_class in enum_validations:
+    for field, valid_values in _ENUM_VALIDATIONS:
         if field in result and result[field]:
             try:
                 # 检查值是否在枚举中
-                valid_values = [e.value for e in enum_class]
                 if result[field] not in valid_values:
                     logger.warning(f"无效的{field}值: {result[field]}")
                     return False
@@ -365,23 +480,17 @@ def _validate_enum_values(result: Dict[str, Any]) -> bool:
                 return False
     
     # 验证可选枚举字段
-    optional_enums = [
-        ("business_direction", BusinessDirection),
-        ("business_point", BusinessPoint)
-    ]
-    
-    for field, enum_class in optional_enums:
+    for field, valid_values in _OPTIONAL_ENUM_VALIDATIONS:
         if field in result and result[field] is not None:
             try:
-                valid_values = [e.value for e in enum_class]
                 # 处理多选字段（列表类型）
                 if isinstance(result[field], list):
-                    valid_items = []
-                    for item in result[field]:
-                        if item in valid_values:
-                            valid_items.append(item)
-                        else:
-                            logger.warning(f"无效的{field}项: {item}")
+                    items = result[field]
+                    valid_items = [item for item in items if isinstance(item, str) and item in valid_values]
+                    if len(valid_items) != len(items):
+                        for item in items:
+                            if not (isinstance(item, str) and item in valid_values):
+                                logger.warning(f"无效的{field}项: {item}")
                     result[field] = valid_items if valid_items else None
                 else:
                     # 处理单选字段
@@ -394,6 +503,17 @@ def _validate_enum_values(result: Dict[str, Any]) -> bool:
     return True
 
 
+def _detect_source(url: str) -> Optional[str]:
+    """根据URL识别来源平台."""
+    if "github.com" in url:
+        return "GitHub"
+    elif "huggingface.co" in url:
+        return "HuggingFace"
+    elif "kaggle.com" in url:
+        return "Kaggle"
+    return None
+
+
 def _simulate_intelligent_expansion(
     dataset_name: str,
     preliminary: Dict[str, Any],
@@ -416,12 +536,9 @@ def _simulate_intelligent_expansion(
     
     # 推断source从source_url
     if result["source_url"]:
-        if "github.com" in result["source_url"]:
-            result["source"] = "GitHub"
-        elif "huggingface.co" in result["source_url"]:
-            result["source"] = "HuggingFace"
-        elif "kaggle.com" in result["source_url"]:
-            result["source"] = "Kaggle"
+        source = _detect_source(result["source_url"])
+        if source:
+            result["source"] = source
     
     # 智能扩展business_direction（模拟LLM基于领域知识的扩展）
     doc_business_direction = doc_info.get("business_direction", [])
@@ -545,12 +662,9 @@ def _fallback_to_preliminary(preliminary: Dict[str, Any], web_search: List[Dict[
             result["source_url"] = url
             
         if not result.get("source"):
-            if "github.com" in url:
-                result["source"] = "GitHub"
-            elif "huggingface.co" in url:
-                result["source"] = "HuggingFace"
-            elif "kaggle.com" in url:
-                result["source"] = "Kaggle"
+            source = _detect_source(url)
+            if source:
+                result["source"] = source
     
     return result
 
@@ -559,17 +673,18 @@ def _supplement_with_local_data(
     meta: Dict[str, Any],
     files: List,
     total_size: int,
-    state
+    state,
+    log=logger
 ) -> Dict[str, Any]:
     """用本地统计数据和文档信息补充元数据."""
     
     # 获取从文档中解析的真实信息（已在LLM提示词中作为上下文使用）
     doc_info = _get_state_value(state, "doc_info", {})
     
-    logger.info("补充本地数据",
-               doc_fields=list(doc_info.keys()) if doc_info else [],
-               meta_fields_before=list(meta.keys()),
-               has_doc_info=bool(doc_info))
+    log.info("补充本地数据",
+            doc_fields=list(doc_info.keys()) if doc_info else [],
+            meta_fields_before=list(meta.keys()),
+            has_doc_info=bool(doc_info))
     
     # 添加本地统计信息（如果文档中没有提供）
     if "size" not in meta or not meta["size"]:
@@ -589,18 +704,16 @@ def _supplement_with_local_data(
     if "access_level" not in meta:
         meta["access_level"] = "public"
     
-    # 估算记录数
-    if "num_records" not in meta:
-        meta["num_records"] = _estimate_record_count(files)
-    
-    # 语言检测 (简化版)
-    if "languages" not in meta:
-        meta["languages"] = _detect_languages_from_files(files)
+    # 估算记录数和语言检测 (简化版)，一次遍历文件列表同时完成
+    if "num_records" not in meta or "languages" not in meta:
+        record_count, languages = _scan_file_stats(files)
+        meta.setdefault("num_records", record_count)
+        meta.setdefault("languages", languages)
     
     source_url = meta.get("source_url") or ""
-    logger.info("本地数据补充完成",
-               final_fields=list(meta.keys()),
-               has_real_source_url=bool(source_url.startswith("http")))
+    log.info("本地数据补充完成",
+            final_fields=list(meta.keys()),
+            has_real_source_url=bool(source_url.startswith("http")))
     
     return meta
 
@@ -617,62 +730,41 @@ def _format_size(size_bytes: int) -> str:
         return f"{size_bytes / (1024 * 1024 * 1024):.1f}GB"
 
 
-def _estimate_record_count(files: List) -> Optional[int]:
-    """估算数据记录数."""
+def _scan_file_stats(files: List) -> Tuple[Optional[int], List[str]]:
+    """遍历一次文件列表，同时估算记录数并从文件名中检测语言."""
     record_count = 0
+    paths = []
     
     for file_stat in files:
         if hasattr(file_stat, 'path'):
             path = file_stat.path
+            size = getattr(file_stat, 'size_bytes', 0)
+            lines = getattr(file_stat, 'lines', 0)
+        elif isinstance(file_stat, dict):
+            path = file_stat.get('path', '')
+            size = file_stat.get('size_bytes', 0)
+            lines = file_stat.get('lines', 0)
         else:
-            path = file_stat.get('path', '') if isinstance(file_stat, dict) else ''
-            
-        # 根据文件类型估算记录数
-        if path.endswith(('.json', '.jsonl')):
-            # JSON文件按文件大小估算
-            size = getattr(file_stat, 'size_bytes', 0) if hasattr(file_stat, 'size_bytes') else file_stat.get('size_bytes', 0)
-            record_count += max(1, size // 500)  # 假设平均每条记录500字节
-        elif path.endswith('.csv'):
-            # CSV文件按行数估算
-            lines = getattr(file_stat, 'lines', 0) if hasattr(file_stat, 'lines') else 0
-            lines = lines if lines is not None else 0  # 确保lines不为None
-            if lines > 0:
-                record_count += max(0, lines - 1)  # 减去标题行
-        elif path.endswith('.txt'):
-            # 文本文件按行数估算
-            lines = getattr(file_stat, 'lines', 0) if hasattr(file_stat, 'lines') else 0
-            lines = lines if lines is not None else 0  # 确保lines不为None
-            record_count += max(1, lines // 10)  # 假设10行为一条记录
-    
-    return record_count if record_count > 0 else None
-
-
-def _detect_languages_from_files(files: List) -> List[str]:
-    """从文件名中检测语言."""
-    languages = set()
-    
-    # 检查是否有中文文件名或路径
-    has_chinese = False
-    has_english = False
-    
-    for file_stat in files:
-        if hasattr(file_stat, 'path'):
-            path = file_stat.path
-        else:
-            path = file_stat.get('path', '') if isinstance(file_stat, dict) else ''
+            path, size, lines = '', 0, 0
+        
+        paths.append(path)
         
-        # 简单的语言检测
-        if re.search(r'[\u4e00-\u9fff]', path):
-            has_chinese = True
-        if re.search(r'[a-zA-Z]', path):
-            has_english = True
+        # 根据扩展名查表选择估算规则
+        _, dot, ext = path.rpartition('.')
+        ext_id = _RECORD_EXT_IDS.get(ext) if dot else None
+        if ext_id is not None:
+            record_count += _RECORD_ESTIMATORS[ext_id](size or 0, lines or 0)
     
-    if has_chinese:
+    # 拼接所有路径后整体扫描一次，避免逐文件调用正则
+    blob = "\x00".join(paths)
+    
+    languages = set()
+    if _CHINESE_RE.search(blob):
         languages.add("zh")
-    if has_english:
+    if _ENGLISH_RE.search(blob):
         languages.add("en")
     
     if not languages:
         languages.add("en")  # 默认英文
     
-    return list(languages)
\ No newline at end of file
+    return (record_count if record_count > 0 else None), list(languages)
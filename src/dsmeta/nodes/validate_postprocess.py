@@ -1,17 +1,112 @@
 """校验与后处理节点 - 对生成的元数据进行验证、规范化和补充处理."""
 
+import asyncio
+import copy
 import hashlib
+import json
+import re
+import threading
 import uuid
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 import structlog
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 from ..models import DatasetMetadata, DataModality, UseCase, Domain, Rating, PIIRisk, AccessLevel, BusinessDirection, BusinessPoint
 from ..config import Config
 
 logger = structlog.get_logger(__name__)
 
+# 复用已编译的校验器，避免每次验证重新构建模型
+_DATASET_METADATA_ADAPTER = TypeAdapter(DatasetMetadata)
+
+# 单选枚举字段映射
+_ENUM_FIELDS = {
+    "modality": DataModality,
+    "use_case": UseCase,
+    "domain": Domain,
+    "rating": Rating,
+    "pii_risk": PIIRisk,
+    "access_level": AccessLevel
+}
+
+# 多选枚举字段映射
+_MULTI_ENUM_FIELDS = {
+    "business_direction": BusinessDirection,
+    "business_point": BusinessPoint
+}
+
+# 允许以 "|" 分隔字符串形式给出的多选字段
+_MULTI_SELECT_FIELDS = frozenset({"business_direction", "business_point", "task_types"})
+
+# 各枚举字段的合法取值 (按枚举定义顺序)
+_ENUM_VALUES = {
+    field: tuple(e.value for e in enum_class)
+    for field, enum_class in {**_ENUM_FIELDS, **_MULTI_ENUM_FIELDS}.items()
+}
+
+# 各枚举字段的合法取值集合，用于O(1)成员判断
+_ENUM_VALUE_SETS = {field: frozenset(values) for field, values in _ENUM_VALUES.items()}
+
+# casefold形式 -> 标准取值，用于大小写不敏感的精确匹配
+_ENUM_VALUES_LOWER = {
+    field: {value.casefold(): value for value in values}
+    for field, values in _ENUM_VALUES.items()
+}
+
+# (casefold形式, 标准取值) 对，用于包含匹配
+_ENUM_LOWER_PAIRS = {
+    field: tuple((value.casefold(), value) for value in values)
+    for field, values in _ENUM_VALUES.items()
+}
+
+# 关键词 -> 枚举取值
+_KEYWORD_MAPPING = {
+    "text": "自然语言文本",
+    "code": "代码", 
+    "image": "图像",
+    "audio": "音频",
+    "video": "视频",
+    "table": "结构化/表格",
+    "training": "模型预训练",
+    "finetune": "模型微调",
+    "eval": "模型评测",
+    "basic": "基础",
+    "advanced": "高级",
+    "cyber": "网络攻防",
+    "security": "安全认知"
+}
+
+# 所有关键词的多模式匹配，零宽前瞻使重叠出现的关键词也能被找到
+_KEYWORD_RE = re.compile("(?=(" + "|".join(map(re.escape, _KEYWORD_MAPPING)) + "))")
+
+# URL有效性检查
+_URL_RE = re.compile(
+    r'^https?://'  # http:// or https://
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
+    r'localhost|'  # localhost...
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
+    r'(?::\d+)?'  # optional port
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+
+# 枚举字段的默认值
+_ENUM_DEFAULTS = {
+    "modality": DataModality.CODE.value,
+    "use_case": UseCase.EVALUATION.value,
+    "domain": Domain.GENERAL.value,
+    "rating": Rating.BASIC.value,
+    "pii_risk": PIIRisk.NONE.value,
+    "access_level": AccessLevel.PUBLIC.value
+}
+
+# 后处理结果缓存 (签名 -> 状态更新)，按LRU策略淘汰
+_RESULT_CACHE: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_RESULT_CACHE_MAXSIZE = 128
+# 后处理在工作线程中执行，缓存读写需加锁
+_RESULT_CACHE_LOCK = threading.Lock()
+
 
 async def validate_and_postprocess(state, config: Optional[Config] = None) -> Dict[str, Any]:
     """
@@ -28,12 +123,48 @@ async def validate_and_postprocess(state, config: Optional[Config] = None) -> Di
         from ..config import load_config
         config = load_config()
 
+    # 后处理全部为同步CPU计算，放到线程中执行以免阻塞事件循环
+    return await asyncio.to_thread(_sync_validate_and_postprocess, state, config)
+
+
+@dataclass
+class _Snap:
+    """后处理所需状态字段的快照，只在入口处读取一次状态."""
+    __slots__ = ("processing_id", "meta", "files", "total_size",
+                 "dataset_path", "dataset_name", "creator", "creation_date")
+    processing_id: str
+    meta: Dict[str, Any]
+    files: List
+    total_size: int
+    dataset_path: str
+    dataset_name: Optional[str]
+    creator: Optional[str]
+    creation_date: Optional[str]
+
+
+def _snapshot_state(state) -> _Snap:
+    """从状态中提取后处理所需字段 (支持dict和对象)."""
+    get = state.get if isinstance(state, dict) else lambda key, default=None: getattr(state, key, default)
+    return _Snap(
+        processing_id=get("processing_id", "unknown"),
+        meta=get("meta", {}),
+        files=get("files", []),
+        total_size=get("total_size", 0),
+        dataset_path=get("dataset_path", ""),
+        dataset_name=get("dataset_name", "Unknown Dataset"),
+        creator=get("creator"),
+        creation_date=get("creation_date")
+    )
+
+
+def _sync_validate_and_postprocess(state, config: Config) -> Dict[str, Any]:
+    """validate_and_postprocess 的同步实现，在工作线程中运行."""
+    # 安全获取状态值
+    snap = _snapshot_state(state)
+    
     try:
-        # 安全获取状态值
-        processing_id = _get_state_value(state, "processing_id", "unknown")
-        meta = _get_state_value(state, "meta", {})
-        files = _get_state_value(state, "files", [])
-        total_size = _get_state_value(state, "total_size", 0)
+        processing_id = snap.processing_id
+        meta = snap.meta
         
         logger.info("开始元数据校验与后处理",
                    processing_id=processing_id,
@@ -49,68 +180,35 @@ async def validate_and_postprocess(state, config: Optional[Config] = None) -> Di
                 "error_message": error_msg
             }
         
-        # 第一步：基础数据清理和规范化
-        cleaned_meta = _clean_and_normalize_meta(meta)
-        
-        # 第二步：补充缺失的必需字段
-        complete_meta = _supplement_required_fields(cleaned_meta, state)
-        
-        # 第三步：计算文件格式统计
-        complete_meta["file_formats"] = _calculate_file_format_stats(files, total_size)
-        
-        # 第四步：枚举值验证和修正
-        if config.quality_control.enum_validation:
-            validated_meta = _validate_and_fix_enum_values(complete_meta)
-        else:
-            validated_meta = complete_meta
-        
-        # 第五步：生成聚合校验和
-        validated_meta["checksum"] = _generate_dataset_checksum(state, files)
+        # 相同输入直接复用上次的后处理结果
+        cache_enabled = config.node_config.cache_enabled
+        if cache_enabled:
+            signature = _compute_state_signature(snap, config)
+            with _RESULT_CACHE_LOCK:
+                cached = _RESULT_CACHE.get(signature)
+                if cached is not None:
+                    _RESULT_CACHE.move_to_end(signature)
+            if cached is not None:
+                logger.info("命中后处理缓存", processing_id=processing_id)
+                return copy.deepcopy(cached)
         
-        # 第六步：质量控制检查
-        quality_issues = _perform_quality_checks(validated_meta, config)
-        if quality_issues:
-            validated_meta["quality_issues"] = quality_issues
-            logger.warning("发现数据质量问题", issues=quality_issues)
+        result = _postprocess_meta(snap, config)
         
-        # 第七步：Pydantic模型验证（可选）
-        validation_result = _validate_with_pydantic(validated_meta)
+        if cache_enabled:
+            cached = copy.deepcopy(result)
+            with _RESULT_CACHE_LOCK:
+                _RESULT_CACHE[signature] = cached
+                if len(_RESULT_CACHE) > _RESULT_CACHE_MAXSIZE:
+                    _RESULT_CACHE.popitem(last=False)
         
-        if validation_result["valid"]:
-            logger.info("元数据验证成功",
-                       processing_id=processing_id,
-                       total_fields=len(validated_meta),
-                       quality_issues=len(quality_issues))
-            
-            return {
-                "current_step": "validate_and_postprocess",
-                "status": "processing",
-                "meta": validated_meta,
-                "validation_passed": True,
-                "quality_score": _calculate_quality_score(validated_meta, quality_issues)
-            }
-        else:
-            logger.warning("Pydantic验证失败，使用修正后的数据",
-                          validation_errors=validation_result["errors"])
-            
-            # 使用修正策略处理验证失败
-            fixed_meta = _fix_validation_errors(validated_meta, validation_result["errors"])
-            
-            return {
-                "current_step": "validate_and_postprocess", 
-                "status": "processing",
-                "meta": fixed_meta,
-                "validation_passed": False,
-                "validation_errors": validation_result["errors"],
-                "quality_score": _calculate_quality_score(fixed_meta, quality_issues)
-            }
+        return result
         
     except Exception as e:
         error_msg = f"元数据校验与后处理出错: {str(e)}"
         logger.error(error_msg, exc_info=True)
         
         # 降级处理：返回基础元数据
-        fallback_meta = _create_fallback_metadata(state)
+        fallback_meta = _create_fallback_metadata(snap)
         
         return {
             "current_step": "validate_and_postprocess",
@@ -121,46 +219,148 @@ async def validate_and_postprocess(state, config: Optional[Config] = None) -> Di
         }
 
 
-def _get_state_value(state, key, default=None):
-    """安全地从状态中获取值 (支持dict和对象)."""
-    if isinstance(state, dict):
-        return state.get(key, default)
+def _postprocess_meta(snap: _Snap, config: Config) -> Dict[str, Any]:
+    """执行清理、补充、校验和质量检查，返回状态更新."""
+    # 第一步：清理规范化、枚举修正并补充必需字段 (单次遍历)
+    validated_meta = _process_meta(snap.meta, snap, config.quality_control.enum_validation)
+    
+    # 第二步：计算文件格式统计
+    validated_meta["file_formats"] = _calculate_file_format_stats(snap.files, snap.total_size)
+    
+    # 第三步：生成聚合校验和
+    validated_meta["checksum"] = _generate_dataset_checksum(snap)
+    
+    # 第四步：质量控制检查
+    quality_issues = _perform_quality_checks(validated_meta, config)
+    if quality_issues:
+        validated_meta["quality_issues"] = quality_issues
+        logger.warning("发现数据质量问题", issues=quality_issues)
+    
+    # 第五步：Pydantic模型验证（可选，前面已确定性地修正枚举并补齐字段）
+    if config.quality_control.pydantic_validation:
+        validation_result = _validate_with_pydantic(validated_meta)
     else:
-        return getattr(state, key, default)
+        validation_result = {"valid": True, "errors": []}
+    
+    if validation_result["valid"]:
+        logger.info("元数据验证成功",
+                   processing_id=snap.processing_id,
+                   total_fields=len(validated_meta),
+                   quality_issues=len(quality_issues))
+        
+        return {
+            "current_step": "validate_and_postprocess",
+            "status": "processing",
+            "meta": validated_meta,
+            "validation_passed": True,
+            "quality_score": _calculate_quality_score(validated_meta, quality_issues)
+        }
+    else:
+        validation_errors = _format_validation_errors(validation_result["errors"])
+        logger.warning("Pydantic验证失败，使用修正后的数据",
+                      validation_errors=validation_errors)
+        
+        # 使用修正策略处理验证失败
+        fixed_meta = _fix_validation_errors(validated_meta, validation_result["errors"])
+        
+        return {
+            "current_step": "validate_and_postprocess", 
+            "status": "processing",
+            "meta": fixed_meta,
+            "validation_passed": False,
+            "validation_errors": validation_errors,
+            "quality_score": _calculate_quality_score(fixed_meta, quality_issues)
+        }
+
+
+def _compute_state_signature(snap: _Snap, config: Config) -> str:
+    """根据影响后处理结果的输入计算缓存签名."""
+    hasher = hashlib.blake2b(digest_size=16)
+    
+    for value in (snap.dataset_path, snap.dataset_name, snap.creator, snap.creation_date, snap.total_size):
+        hasher.update(f"{value}|".encode('utf-8'))
+    
+    for file_stat in snap.files:
+        if isinstance(file_stat, dict):
+            path = file_stat.get('path', '')
+            size = file_stat.get('size_bytes', 0)
+            fmt = file_stat.get('format', '.unknown')
+            sha256 = file_stat.get('sha256', '')
+        else:
+            path = file_stat.path
+            size = file_stat.size_bytes
+            fmt = file_stat.format
+            sha256 = file_stat.sha256
+        hasher.update(f"{path}:{size}:{fmt}:{sha256}|".encode('utf-8'))
+    
+    hasher.update(json.dumps(snap.meta, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+    hasher.update(config.quality_control.model_dump_json().encode('utf-8'))
+    
+    return hasher.hexdigest()
 
 
-def _clean_and_normalize_meta(meta: Dict[str, Any]) -> Dict[str, Any]:
-    """清理和规范化元数据."""
-    cleaned = {}
+def _process_meta(meta: Dict[str, Any], snap: _Snap, enum_validation: bool) -> Dict[str, Any]:
+    """单次遍历完成元数据清理、枚举修正和必需字段补充."""
+    processed = {}
     
     for key, value in meta.items():
+        value = _clean_value(value)
         if value is None:
             continue
+        
+        if enum_validation:
+            # 多选字段从字符串转为列表
+            if key in _MULTI_SELECT_FIELDS and isinstance(value, str):
+                value = [item.strip() for item in value.split('|') if item.strip()]
             
-        # 字符串清理
-        if isinstance(value, str):
-            # 去除首尾空白
-            value = value.strip()
-            # 空字符串转为None
-            if not value:
-                continue
-            # 统一换行符
-            value = value.replace('\r\n', '\n').replace('\r', '\n')
-            
-        # 列表清理
-        elif isinstance(value, list):
-            # 移除空值和重复项
-            value = [item for item in value if item is not None and str(item).strip()]
-            value = list(dict.fromkeys(value))  # 去重但保持顺序
-            if not value:
-                continue
+            if key in _ENUM_FIELDS:
+                value = _fix_enum_value(key, value)
+            elif key in _MULTI_ENUM_FIELDS and isinstance(value, list):
+                value = _fix_multi_enum_values(key, value)
+        
+        processed[key] = value
+    
+    return _supplement_required_fields(processed, snap)
+
+
+def _clean_value(value: Any) -> Any:
+    """清理单个字段值，返回None表示应丢弃该字段."""
+    if value is None:
+        return None
+        
+    # 字符串清理
+    if isinstance(value, str):
+        # 去除首尾空白
+        value = value.strip()
+        # 空字符串转为None
+        if not value:
+            return None
+        # 统一换行符
+        return value.replace('\r\n', '\n').replace('\r', '\n')
         
-        cleaned[key] = value
+    # 列表清理
+    if isinstance(value, list):
+        # 移除空值和重复项
+        value = [item for item in value if item is not None and str(item).strip()]
+        if not value:
+            return None
+        try:
+            value = list(dict.fromkeys(value))  # 去重但保持顺序
+        except TypeError:
+            # 含不可哈希的项 (如dict) 时按repr比较去重
+            seen = set()
+            unique = []
+            for item in value:
+                key = repr(item)
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(item)
+            value = unique
     
-    return cleaned
+    return value
 
 
-def _supplement_required_fields(meta: Dict[str, Any], state) -> Dict[str, Any]:
+def _supplement_required_fields(meta: Dict[str, Any], snap: _Snap) -> Dict[str, Any]:
     """补充缺失的必需字段."""
     
     # 生成唯一ID
@@ -169,7 +369,7 @@ def _supplement_required_fields(meta: Dict[str, Any], state) -> Dict[str, Any]:
     
     # 确保有基本名称
     if "name" not in meta:
-        meta["name"] = _get_state_value(state, "dataset_name", "Unknown Dataset")
+        meta["name"] = snap.dataset_name
     
     # 确保有描述
     if "description" not in meta:
@@ -177,10 +377,10 @@ def _supplement_required_fields(meta: Dict[str, Any], state) -> Dict[str, Any]:
     
     # 补充管理信息
     if "creator" not in meta:
-        meta["creator"] = _get_state_value(state, "creator")
+        meta["creator"] = snap.creator
     
     if "creation_date" not in meta:
-        meta["creation_date"] = _get_state_value(state, "creation_date")
+        meta["creation_date"] = snap.creation_date
     
     # 设置默认版本
     if "version" not in meta:
@@ -191,11 +391,8 @@ def _supplement_required_fields(meta: Dict[str, Any], state) -> Dict[str, Any]:
         meta["access_level"] = AccessLevel.PUBLIC.value
     
     # 补充文件统计
-    files = _get_state_value(state, "files", [])
-    total_size = _get_state_value(state, "total_size", 0)
-    
-    meta["size"] = _format_size(total_size)
-    meta["num_files"] = len(files)
+    meta["size"] = _format_size(snap.total_size)
+    meta["num_files"] = len(snap.files)
     
     # 语言检测
     if "languages" not in meta:
@@ -209,113 +406,75 @@ def _calculate_file_format_stats(files: List, total_size: int) -> List[Dict[str,
     if not files:
         return []
     
-    format_stats = {}
+    # 格式 -> [文件数, 总大小]
+    format_stats = defaultdict(lambda: [0, 0])
     
     # 统计各格式的文件数和大小
     for file_stat in files:
-        if hasattr(file_stat, 'format'):
-            fmt = file_stat.format
-            size = getattr(file_stat, 'size_bytes', 0)
-        else:
-            # dict格式
+        if isinstance(file_stat, dict):
             fmt = file_stat.get('format', '.unknown')
             size = file_stat.get('size_bytes', 0)
+        else:
+            fmt = file_stat.format
+            size = file_stat.size_bytes
         
-        if fmt not in format_stats:
-            format_stats[fmt] = {"count": 0, "size": 0}
-        
-        format_stats[fmt]["count"] += 1
-        format_stats[fmt]["size"] += size
+        stats = format_stats[fmt]
+        stats[0] += 1
+        stats[1] += size
     
-    # 转换为列表格式
+    # 按原始字节数排序后转换为列表格式
     result = []
-    for fmt, stats in format_stats.items():
-        ratio = (stats["size"] / total_size * 100) if total_size > 0 else 0
+    for fmt, (count, size) in sorted(format_stats.items(), key=lambda item: item[1][1], reverse=True):
+        ratio = (size / total_size * 100) if total_size > 0 else 0
         
         result.append({
             "format": fmt,
-            "count": stats["count"],
-            "size": _format_size(stats["size"]),
+            "count": count,
+            "size": _format_size(size),
             "ratio": f"{ratio:.1f}%"
         })
     
-    # 按大小排序
-    result.sort(key=lambda x: float(x["ratio"].rstrip('%')), reverse=True)
-    
     return result
 
 
-def _validate_and_fix_enum_values(meta: Dict[str, Any]) -> Dict[str, Any]:
-    """验证和修正枚举字段的值."""
-    
-    # 处理多选字段（从字符串转为列表）
-    multi_select_fields = ["business_direction", "business_point", "task_types"]
-    for field in multi_select_fields:
-        if field in meta and isinstance(meta[field], str):
-            # 如果是字符串，尝试分割为列表
-            if '|' in meta[field]:
-                meta[field] = [item.strip() for item in meta[field].split('|') if item.strip()]
-            else:
-                meta[field] = [meta[field]] if meta[field].strip() else []
-    
-    # 枚举字段映射
-    enum_fields = {
-        "modality": DataModality,
-        "use_case": UseCase,
-        "domain": Domain,
-        "rating": Rating,
-        "pii_risk": PIIRisk,
-        "access_level": AccessLevel
-    }
+def _fix_enum_value(field: str, value: Any) -> str:
+    """验证单选枚举字段的值，无效时尝试修正或使用默认值."""
+    if value in _ENUM_VALUE_SETS[field]:
+        return value
     
-    for field, enum_class in enum_fields.items():
-        if field in meta and meta[field] is not None:
-            current_value = meta[field]
-            valid_values = [e.value for e in enum_class]
-            
-            if current_value not in valid_values:
-                logger.warning(f"无效的{field}值: {current_value}，尝试修正")
-                
-                # 尝试模糊匹配
-                fixed_value = _fuzzy_match_enum_value(current_value, valid_values)
-                if fixed_value:
-                    meta[field] = fixed_value
-                    logger.info(f"已修正{field}: {current_value} -> {fixed_value}")
-                else:
-                    # 使用默认值
-                    default_value = _get_default_enum_value(field, enum_class)
-                    meta[field] = default_value
-                    logger.info(f"使用{field}默认值: {default_value}")
-    
-    # 验证多选枚举字段
-    multi_enum_fields = {
-        "business_direction": BusinessDirection,
-        "business_point": BusinessPoint
-    }
+    logger.warning(f"无效的{field}值: {value}，尝试修正")
     
-    for field, enum_class in multi_enum_fields.items():
-        if field in meta and meta[field] is not None:
-            if isinstance(meta[field], list):
-                # 验证列表中的每个值
-                valid_values = [e.value for e in enum_class]
-                corrected_list = []
-                
-                for item in meta[field]:
-                    if item in valid_values:
-                        corrected_list.append(item)
-                    else:
-                        # 尝试模糊匹配
-                        fixed_item = _fuzzy_match_enum_value(item, valid_values)
-                        if fixed_item:
-                            corrected_list.append(fixed_item)
-                            logger.info(f"已修正{field}项: {item} -> {fixed_item}")
-                
-                meta[field] = corrected_list
+    # 尝试模糊匹配
+    fixed_value = _fuzzy_match_enum_value(value, field)
+    if fixed_value:
+        logger.info(f"已修正{field}: {value} -> {fixed_value}")
+        return fixed_value
     
-    return meta
+    # 使用默认值
+    default_value = _get_default_enum_value(field, _ENUM_FIELDS[field])
+    logger.info(f"使用{field}默认值: {default_value}")
+    return default_value
 
 
-def _fuzzy_match_enum_value(value: str, valid_values: List[str]) -> Optional[str]:
+def _fix_multi_enum_values(field: str, values: List) -> List[str]:
+    """验证多选枚举字段，保留合法值和可修正的值."""
+    valid_values = _ENUM_VALUE_SETS[field]
+    corrected_list = []
+    
+    for item in values:
+        if item in valid_values:
+            corrected_list.append(item)
+        else:
+            # 尝试模糊匹配
+            fixed_item = _fuzzy_match_enum_value(item, field)
+            if fixed_item:
+                corrected_list.append(fixed_item)
+                logger.info(f"已修正{field}项: {item} -> {fixed_item}")
+    
+    return corrected_list
+
+
+def _fuzzy_match_enum_value(value: str, field: str) -> Optional[str]:
     """模糊匹配枚举值，支持管道分隔的值."""
     if not value:
         return None
@@ -324,76 +483,53 @@ def _fuzzy_match_enum_value(value: str, valid_values: List[str]) -> Optional[str
     if '|' in value:
         parts = [part.strip() for part in value.split('|')]
         for part in parts:
-            result = _fuzzy_match_enum_value(part, valid_values)
+            result = _fuzzy_match_enum_value(part, field)
             if result:
                 return result
     
-    value_lower = value.lower()
+    value_lower = value.casefold()
     
     # 精确匹配
-    for valid in valid_values:
-        if valid.lower() == value_lower:
-            return valid
+    exact = _ENUM_VALUES_LOWER[field].get(value_lower)
+    if exact:
+        return exact
     
     # 包含匹配
-    for valid in valid_values:
-        if value_lower in valid.lower() or valid.lower() in value_lower:
+    for valid_lower, valid in _ENUM_LOWER_PAIRS[field]:
+        if value_lower in valid_lower or valid_lower in value_lower:
             return valid
     
-    # 关键词匹配
-    keyword_mapping = {
-        "text": "自然语言文本",
-        "code": "代码", 
-        "image": "图像",
-        "audio": "音频",
-        "video": "视频",
-        "table": "结构化/表格",
-        "training": "模型预训练",
-        "finetune": "模型微调",
-        "eval": "模型评测",
-        "basic": "基础",
-        "advanced": "高级",
-        "cyber": "网络攻防",
-        "security": "安全认知"
-    }
-    
-    for keyword, mapped_value in keyword_mapping.items():
-        if keyword in value_lower and mapped_value in valid_values:
-            return mapped_value
+    # 关键词匹配：单次扫描找出出现的关键词，再按映射表顺序取第一个合法值
+    found = {match.group(1) for match in _KEYWORD_RE.finditer(value_lower)}
+    if found:
+        valid_values = _ENUM_VALUE_SETS[field]
+        for keyword, mapped_value in _KEYWORD_MAPPING.items():
+            if keyword in found and mapped_value in valid_values:
+                return mapped_value
     
     return None
 
 
 def _get_default_enum_value(field: str, enum_class) -> str:
     """获取枚举字段的默认值."""
-    defaults = {
-        "modality": DataModality.CODE.value,
-        "use_case": UseCase.EVALUATION.value,
-        "domain": Domain.GENERAL.value,
-        "rating": Rating.BASIC.value,
-        "pii_risk": PIIRisk.NONE.value,
-        "access_level": AccessLevel.PUBLIC.value
-    }
-    
-    return defaults.get(field, list(enum_class)[0].value)
+    return _ENUM_DEFAULTS.get(field, list(enum_class)[0].value)
 
 
-def _generate_dataset_checksum(state, files: List) -> str:
+def _generate_dataset_checksum(snap: _Snap) -> str:
     """生成数据集的聚合校验和."""
     
-    # 收集用于校验和计算的数据
-    checksum_data = []
+    # 逐项写入哈希，不再拼接完整的中间字符串
+    # 校验和仅用作标识，使用更快的blake2b，8字节摘要即16位十六进制
+    hasher = hashlib.blake2b(digest_size=8)
     
     # 数据集路径
-    dataset_path = _get_state_value(state, "dataset_path", "")
-    checksum_data.append(dataset_path)
+    hasher.update(snap.dataset_path.encode('utf-8'))
     
     # 总大小
-    total_size = _get_state_value(state, "total_size", 0)
-    checksum_data.append(str(total_size))
+    hasher.update(f"|{snap.total_size}".encode('utf-8'))
     
     # 文件列表信息
-    for file_stat in files:
+    for file_stat in snap.files:
         if hasattr(file_stat, 'path'):
             path = file_stat.path
             size = getattr(file_stat, 'size_bytes', 0)
@@ -404,37 +540,36 @@ def _generate_dataset_checksum(state, files: List) -> str:
             size = file_stat.get('size_bytes', 0)
             sha256 = file_stat.get('sha256', '')
         
-        checksum_data.append(f"{path}:{size}:{sha256}")
+        hasher.update(f"|{path}:{size}:{sha256}".encode('utf-8'))
     
-    # 计算SHA256
-    combined_data = '|'.join(checksum_data)
-    return hashlib.sha256(combined_data.encode('utf-8')).hexdigest()[:16]
+    return hasher.hexdigest()
 
 
 def _perform_quality_checks(meta: Dict[str, Any], config: Config) -> List[str]:
     """执行质量控制检查."""
     issues = []
+    qc = config.quality_control
     
     # 检查必需字段
-    for field in config.quality_control.required_fields:
-        if field not in meta or not meta[field]:
+    for field in qc.required_fields:
+        if not meta.get(field):
             issues.append(f"缺少必需字段: {field}")
     
     # 检查描述长度
-    description = meta.get("description", "")
-    if len(description) < 10:
+    desc_len = len(meta.get("description", ""))
+    if desc_len < 10:
         issues.append("描述过短，建议至少10个字符")
-    elif len(description) > 500:
+    elif desc_len > 500:
         issues.append("描述过长，建议不超过500个字符")
     
     # 检查置信度
     confidence = meta.get("confidence_score", 1.0)
-    if confidence < config.quality_control.min_confidence_score:
+    if confidence < qc.min_confidence_score:
         issues.append(f"置信度过低: {confidence}")
     
-    # 检查URL有效性
+    # 检查URL有效性 (非http开头的直接判为无效，无需执行正则)
     source_url = meta.get("source_url")
-    if source_url and not _is_valid_url(source_url):
+    if source_url and (source_url[:4].lower() != "http" or not _is_valid_url(source_url)):
         issues.append(f"无效的源URL: {source_url}")
     
     return issues
@@ -442,56 +577,44 @@ def _perform_quality_checks(meta: Dict[str, Any], config: Config) -> List[str]:
 
 def _is_valid_url(url: str) -> bool:
     """检查URL是否有效."""
-    import re
-    url_pattern = re.compile(
-        r'^https?://'  # http:// or https://
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
-        r'localhost|'  # localhost...
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-        r'(?::\d+)?'  # optional port
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-    
-    return bool(url_pattern.match(url))
+    return bool(_URL_RE.match(url))
 
 
 def _validate_with_pydantic(meta: Dict[str, Any]) -> Dict[str, Any]:
-    """使用Pydantic模型验证元数据."""
+    """使用Pydantic模型验证元数据，错误以 {"loc", "msg"} 结构返回."""
     try:
-        # 尝试创建DatasetMetadata实例
-        dataset_meta = DatasetMetadata(**meta)
+        _DATASET_METADATA_ADAPTER.validate_python(meta)
         return {"valid": True, "errors": []}
     
     except ValidationError as e:
-        errors = []
-        for error in e.errors():
-            field = ".".join(str(loc) for loc in error["loc"])
-            msg = error["msg"]
-            errors.append(f"{field}: {msg}")
-        
+        errors = [{"loc": error["loc"], "msg": error["msg"]} for error in e.errors()]
         return {"valid": False, "errors": errors}
     
     except Exception as e:
-        return {"valid": False, "errors": [f"验证错误: {str(e)}"]}
+        return {"valid": False, "errors": [{"loc": (), "msg": f"验证错误: {str(e)}"}]}
+
+
+def _format_validation_errors(errors: List[Dict[str, Any]]) -> List[str]:
+    """将结构化验证错误格式化为 "字段: 信息" 字符串."""
+    formatted = []
+    for error in errors:
+        if error["loc"]:
+            field = ".".join(str(loc) for loc in error["loc"])
+            formatted.append(f"{field}: {error['msg']}")
+        else:
+            formatted.append(error["msg"])
+    return formatted
 
 
-def _fix_validation_errors(meta: Dict[str, Any], errors: List[str]) -> Dict[str, Any]:
+def _fix_validation_errors(meta: Dict[str, Any], errors: List[Dict[str, Any]]) -> Dict[str, Any]:
     """修正验证错误."""
     fixed_meta = meta.copy()
     
-    # 基于错误信息进行修正
+    # 按出错的顶层字段直接查表替换为默认值
     for error in errors:
-        if "modality" in error:
-            fixed_meta["modality"] = DataModality.CODE.value
-        elif "use_case" in error:
-            fixed_meta["use_case"] = UseCase.EVALUATION.value
-        elif "domain" in error:
-            fixed_meta["domain"] = Domain.GENERAL.value
-        elif "rating" in error:
-            fixed_meta["rating"] = Rating.BASIC.value
-        elif "pii_risk" in error:
-            fixed_meta["pii_risk"] = PIIRisk.NONE.value
-        elif "access_level" in error:
-            fixed_meta["access_level"] = AccessLevel.PUBLIC.value
+        loc = error["loc"]
+        if loc and loc[0] in _ENUM_DEFAULTS:
+            fixed_meta[loc[0]] = _ENUM_DEFAULTS[loc[0]]
     
     return fixed_meta
 
@@ -519,12 +642,12 @@ def _calculate_quality_score(meta: Dict[str, Any], quality_issues: List[str]) ->
     return max(0.0, min(1.0, score))
 
 
-def _create_fallback_metadata(state) -> Dict[str, Any]:
+def _create_fallback_metadata(snap: _Snap) -> Dict[str, Any]:
     """创建降级元数据."""
     
-    dataset_name = _get_state_value(state, "dataset_name", "Unknown Dataset")
-    files = _get_state_value(state, "files", [])
-    total_size = _get_state_value(state, "total_size", 0)
+    dataset_name = snap.dataset_name
+    files = snap.files
+    total_size = snap.total_size
     
     return {
         "id": str(uuid.uuid4()),
@@ -540,9 +663,9 @@ def _create_fallback_metadata(state) -> Dict[str, Any]:
         "access_level": AccessLevel.PUBLIC.value,
         "version": "v1.0",
         "languages": ["en"],
-        "creator": _get_state_value(state, "creator"),
-        "creation_date": _get_state_value(state, "creation_date"),
-        "checksum": _generate_dataset_checksum(state, files),
+        "creator": snap.creator,
+        "creation_date": snap.creation_date,
+        "checksum": _generate_dataset_checksum(snap),
         "file_formats": _calculate_file_format_stats(files, total_size),
         "quality_notes": "使用降级策略生成的基础元数据"
     }
@@ -557,4 +680,4 @@ def _format_size(size_bytes: int) -> str:
     elif size_bytes < 1024 * 1024 * 1024:
         return f"{size_bytes / (1024 * 1024):.1f}MB"
     else:
-        return f"{size_bytes / (1024 * 1024 * 1024):.1f}GB"
\ No newline at end of file
+        return f"{size_bytes / (1024 * 1024 * 1024):.1f}GB"
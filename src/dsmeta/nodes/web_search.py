@@ -1,17 +1,75 @@
 """网页搜索节点 - 用于自动获取数据集的来源信息、许可证和引用信息."""
 
 import asyncio
+import functools
+import itertools
 import json
+import math
+import random
+import re
 from typing import Dict, Any, List, Optional
 import structlog
 import httpx
-from urllib.parse import quote, urljoin
+from urllib.parse import quote, urljoin, urlsplit, urlunsplit
 
 from ..models import DatasetState
 from ..config import Config
+from ..client_pool import ClientPool, HTTP2_AVAILABLE
 
 logger = structlog.get_logger(__name__)
 
+# 进程级复用的搜索HTTP客户端，按事件循环和 (超时, 传输方式) 区分
+_SEARCH_CLIENTS = ClientPool("search", lambda client: client.aclose())
+
+# 可重试的HTTP状态码 (限流及服务端临时错误)
+_RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# 指数退避的基础延迟与上限（秒）
+_RETRY_BASE_DELAY = 1.0
+_RETRY_MAX_DELAY = 30.0
+
+# 优质来源域名及加分 (按优先级排列，只取第一个命中的)
+_DOMAIN_SCORES = {
+    "github.com": 8.0,
+    "huggingface.co": 7.0,
+    "arxiv.org": 6.0,
+    "paperswithcode.com": 5.0,
+    "kaggle.com": 4.0
+}
+
+# 相关关键词，每个命中的关键词加1分
+_RELEVANT_KEYWORDS = (
+    "dataset", "data", "repository", "repo", "license", "citation",
+    "paper", "benchmark", "collection", "corpus"
+)
+
+# 知名/公开数据集的名称指示词
+_PUBLIC_INDICATORS = frozenset({
+    "benchmark", "bench", "eval", "test", "challenge", "competition",
+    "coco", "imagenet", "bert", "glue", "squad", "wiki", "common",
+    "open", "public", "arxiv", "paper", "official"
+})
+
+# 版本号或年份 (通常表示正式发布)
+_VERSION_RE = re.compile(r'v\d+|version|20\d{2}')
+
+# 分词：连续中文片段或3个及以上字母的英文单词
+_TOKEN_RE = re.compile(r'[\u4e00-\u9fff]+|[a-zA-Z]{3,}')
+
+# 关键词提取时移除的常见停用词
+_STOP_WORDS = frozenset({
+    "是", "一个", "的", "和", "或", "在", "用于", "包含", "提供", "支持", "可以", "能够",
+    "数据集", "数据", "文件", "内容", "信息", "this", "is", "a", "an", "the", "and", "or",
+    "in", "for", "with", "to", "of", "that", "dataset", "data", "file", "files"
+})
+
+# 文本相似度 (0~1) 折算到启发式得分的权重
+_TFIDF_WEIGHT = 10.0
+
+# BM25参数
+_BM25_K1 = 1.5
+_BM25_B = 0.75
+
 
 async def web_search(state, config: Optional[Config] = None) -> Dict[str, Any]:
     """
@@ -60,26 +118,29 @@ async def web_search(state, config: Optional[Config] = None) -> Dict[str, Any]:
                 "web_search": []
             }
         
-        # 执行搜索
+        # 执行搜索：共享连接池并发查询，用信号量限制同时在途的请求数
+        semaphore = asyncio.Semaphore(config.search.max_concurrency)
+        
+        client = _get_search_client(config)
+        results_lists = await asyncio.gather(
+            *(_execute_search(client, query, config, semaphore) for query in search_queries),
+            return_exceptions=True
+        )
+        
         all_results = []
-        for query in search_queries:
-            try:
-                results = await _execute_search(query, config)
-                all_results.extend(results)
-                
-                # 避免过于频繁的API调用
-                if len(search_queries) > 1:
-                    await asyncio.sleep(1)
-                    
-            except Exception as e:
+        for query, results in zip(search_queries, results_lists):
+            if isinstance(results, BaseException):
                 logger.warning("搜索查询失败", 
                               query=query, 
-                              error=str(e))
+                              error=str(results))
                 continue
+            all_results.extend(results)
         
         # 去重并过滤结果
         unique_results = _deduplicate_results(all_results)
-        filtered_results = _filter_results(unique_results, dataset_name)
+        query_keywords = _extract_keywords_from_description(preliminary.get("description", ""))
+        filtered_results = _filter_results(unique_results, dataset_name, query_keywords,
+                                           config.search.bm25_threshold)
         
         logger.info("网页搜索完成",
                    processing_id=processing_id,
@@ -145,34 +206,53 @@ def _build_search_queries(dataset_name: str, preliminary: Dict[str, Any]) -> Lis
 
 def _extract_keywords_from_description(description: str) -> List[str]:
     """从描述中提取关键词."""
-    import re
-    
-    # 移除常见停用词和标点
-    stop_words = {
-        "是", "一个", "的", "和", "或", "在", "用于", "包含", "提供", "支持", "可以", "能够",
-        "数据集", "数据", "文件", "内容", "信息", "this", "is", "a", "an", "the", "and", "or", 
-        "in", "for", "with", "to", "of", "that", "dataset", "data", "file", "files"
-    }
-    
     # 提取中英文词汇
-    words = re.findall(r'[\u4e00-\u9fff]+|[a-zA-Z]{3,}', description.lower())
+    words = _TOKEN_RE.findall(description.lower())
+    
+    # 过滤停用词和短词，取前5个即停止
+    keywords = (w for w in words if w not in _STOP_WORDS and len(w) > 2)
     
-    # 过滤停用词和短词
-    keywords = [w for w in words if w not in stop_words and len(w) > 2]
+    return list(itertools.islice(keywords, 5))
+
+
+def _create_search_client(config: Config) -> httpx.AsyncClient:
+    """创建搜索用的HTTP客户端，按配置可选用aiohttp传输."""
+    timeout = httpx.Timeout(config.search.timeout)
+    limits = httpx.Limits(max_connections=20, max_keepalive_connections=20)
     
-    return keywords[:5]
+    if config.search.transport == "aiohttp":
+        try:
+            import aiohttp
+            from httpx_aiohttp import AiohttpTransport
+        except ImportError:
+            logger.warning("未安装httpx-aiohttp，使用默认httpx传输")
+        else:
+            transport = AiohttpTransport(client=aiohttp.ClientSession())
+            return httpx.AsyncClient(timeout=timeout, transport=transport)
+    
+    return httpx.AsyncClient(http2=HTTP2_AVAILABLE, timeout=timeout, limits=limits)
+
+
+def _get_search_client(config: Config) -> httpx.AsyncClient:
+    """获取可复用的搜索客户端，避免每次搜索重建连接池和TLS握手."""
+    return _SEARCH_CLIENTS.get(
+        (config.search.timeout, config.search.transport),
+        lambda: _create_search_client(config)
+    )
 
 
-async def _execute_search(query: str, config: Config) -> List[Dict[str, Any]]:
+async def _execute_search(client: httpx.AsyncClient, query: str, config: Config,
+                          semaphore: asyncio.Semaphore) -> List[Dict[str, Any]]:
     """执行单个搜索查询."""
     if config.search.provider == "tavily":
-        return await _search_tavily(query, config)
+        async with semaphore:
+            return await _search_tavily(client, query, config)
     else:
         logger.warning("不支持的搜索提供商", provider=config.search.provider)
         return []
 
 
-async def _search_tavily(query: str, config: Config) -> List[Dict[str, Any]]:
+async def _search_tavily(client: httpx.AsyncClient, query: str, config: Config) -> List[Dict[str, Any]]:
     """使用Tavily API执行搜索."""
     url = "https://api.tavily.com/search"
     
@@ -187,42 +267,73 @@ async def _search_tavily(query: str, config: Config) -> List[Dict[str, Any]]:
         "include_domains": ["github.com", "huggingface.co", "arxiv.org", "paperswithcode.com"]
     }
     
-    timeout = httpx.Timeout(config.search.timeout)
+    max_attempts = max(1, config.search.max_retries)
     
-    async with httpx.AsyncClient(timeout=timeout) as client:
+    for attempt in range(max_attempts):
+        last_attempt = attempt == max_attempts - 1
+        
         try:
             response = await client.post(url, json=payload)
             response.raise_for_status()
-            
-            data = response.json()
-            results = data.get("results", [])
-            
-            # 转换为统一格式
-            formatted_results = []
-            for result in results:
-                formatted_results.append({
-                    "title": result.get("title", ""),
-                    "url": result.get("url", ""),
-                    "snippet": result.get("content", ""),
-                    "source": "tavily"
-                })
-            
-            return formatted_results
-            
+            break
+        
         except httpx.HTTPStatusError as e:
-            if e.response.status_code == 429:
-                logger.warning("搜索API请求频率限制", query=query)
-                await asyncio.sleep(5)  # 等待后重试
-                raise
-            else:
+            status_code = e.response.status_code
+            if status_code not in _RETRY_STATUS_CODES or last_attempt:
                 logger.error("搜索API错误", 
-                           status_code=e.response.status_code,
-                           query=query)
+                           status_code=status_code,
+                           query=query,
+                           attempt=attempt + 1)
+                raise
+            delay = _retry_delay(attempt, e.response.headers.get("Retry-After"))
+            logger.warning("搜索API暂时不可用，稍后重试",
+                          status_code=status_code,
+                          query=query,
+                          attempt=attempt + 1,
+                          delay=delay)
+        
+        except httpx.TransportError as e:
+            if last_attempt:
+                logger.error("搜索请求失败", query=query, error=str(e), attempt=attempt + 1)
                 raise
+            delay = _retry_delay(attempt)
+            logger.warning("搜索请求网络错误，稍后重试",
+                          query=query,
+                          error=str(e),
+                          attempt=attempt + 1,
+                          delay=delay)
+        
+        await asyncio.sleep(delay)
+    
+    try:
+        data = response.json()
+        results = data.get("results", [])
+        
+        # 转换为统一格式
+        formatted_results = []
+        for result in results:
+            formatted_results.append({
+                "title": result.get("title", ""),
+                "url": result.get("url", ""),
+                "snippet": result.get("content", ""),
+                "source": "tavily"
+            })
         
-        except Exception as e:
-            logger.error("搜索请求失败", query=query, error=str(e))
-            raise
+        return formatted_results
+    
+    except Exception as e:
+        logger.error("搜索响应解析失败", query=query, error=str(e))
+        raise
+
+
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """计算重试等待时间：优先使用Retry-After，否则为带抖动的指数退避."""
+    if retry_after is not None:
+        try:
+            return min(_RETRY_MAX_DELAY, max(0.0, float(retry_after)))
+        except ValueError:
+            pass  # HTTP日期格式等无法解析时退回指数退避
+    return min(_RETRY_MAX_DELAY, _RETRY_BASE_DELAY * 2 ** attempt) + random.uniform(0, 0.25)
 
 
 def _deduplicate_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -232,22 +343,51 @@ def _deduplicate_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     
     for result in results:
         url = result.get("url", "")
-        if url and url not in seen_urls:
-            seen_urls.add(url)
+        if not url:
+            continue
+        # 按规范化后的URL去重，保留首次出现的结果
+        canonical_url = _canonicalize_url(url)
+        if canonical_url not in seen_urls:
+            seen_urls.add(canonical_url)
             unique_results.append(result)
     
     return unique_results
 
 
-def _filter_results(results: List[Dict[str, Any]], dataset_name: str) -> List[Dict[str, Any]]:
+def _canonicalize_url(url: str) -> str:
+    """规范化URL：小写协议和主机名，去除片段、末尾斜杠和utm_*跟踪参数."""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    
+    query = "&".join(
+        param for param in parts.query.split("&")
+        if param and not param.lower().startswith("utm_")
+    )
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), query, ""))
+
+
+def _filter_results(results: List[Dict[str, Any]], dataset_name: str,
+                    query_keywords: Optional[List[str]] = None,
+                    bm25_threshold: Optional[int] = None) -> List[Dict[str, Any]]:
     """过滤和排序搜索结果."""
     if not results:
         return []
     
+    # 以数据集名称和描述关键词为查询，计算各结果与查询的文本相似度；
+    # 结果较多时改用BM25，对长短不一的摘要做长度归一化
+    query = " ".join([dataset_name] + list(query_keywords or []))
+    documents = [f"{result.get('title', '')} {result.get('snippet', '')}" for result in results]
+    if bm25_threshold is not None and len(results) >= bm25_threshold:
+        similarities = _bm25_similarities(documents, query)
+    else:
+        similarities = _tfidf_similarities(documents, query)
+    
     # 计算相关性得分
     scored_results = []
-    for result in results:
-        score = _calculate_relevance_score(result, dataset_name)
+    for result, similarity in zip(results, similarities):
+        score = _calculate_relevance_score(result, dataset_name) + _TFIDF_WEIGHT * similarity
         if score > 0:
             result["relevance_score"] = score
             scored_results.append(result)
@@ -258,6 +398,81 @@ def _filter_results(results: List[Dict[str, Any]], dataset_name: str) -> List[Di
     return scored_results
 
 
+def _tfidf_similarities(documents: List[str], query: str) -> List[float]:
+    """计算每个文档与查询的TF-IDF余弦相似度."""
+    doc_tokens = [_TOKEN_RE.findall(doc.lower()) for doc in documents]
+    
+    # 文档频率与平滑IDF: log((1 + N) / (1 + df)) + 1
+    doc_freq = {}
+    for tokens in doc_tokens:
+        for token in set(tokens):
+            doc_freq[token] = doc_freq.get(token, 0) + 1
+    num_docs = len(documents)
+    idf = {token: math.log((1 + num_docs) / (1 + df)) + 1.0 for token, df in doc_freq.items()}
+    
+    # 查询向量，只保留在结果中出现过的词
+    query_vector = {}
+    for token in _TOKEN_RE.findall(query.lower()):
+        if token in idf:
+            query_vector[token] = query_vector.get(token, 0.0) + idf[token]
+    if not query_vector:
+        return [0.0] * num_docs
+    query_norm = math.sqrt(sum(w * w for w in query_vector.values()))
+    
+    similarities = []
+    for tokens in doc_tokens:
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        doc_norm = math.sqrt(sum((tf * idf[token]) ** 2 for token, tf in counts.items()))
+        if not doc_norm:
+            similarities.append(0.0)
+            continue
+        dot = sum(weight * counts[token] * idf[token]
+                  for token, weight in query_vector.items() if token in counts)
+        similarities.append(dot / (doc_norm * query_norm))
+    
+    return similarities
+
+
+def _bm25_similarities(documents: List[str], query: str) -> List[float]:
+    """计算每个文档对查询的BM25得分，并按最高分归一化到0~1."""
+    doc_tokens = [_TOKEN_RE.findall(doc.lower()) for doc in documents]
+    num_docs = len(documents)
+    avg_len = sum(len(tokens) for tokens in doc_tokens) / num_docs
+    
+    doc_freq = {}
+    for tokens in doc_tokens:
+        for token in set(tokens):
+            doc_freq[token] = doc_freq.get(token, 0) + 1
+    
+    # 只计算出现在结果中的查询词，IDF取非负形式
+    query_idf = {
+        token: math.log((num_docs - doc_freq[token] + 0.5) / (doc_freq[token] + 0.5) + 1.0)
+        for token in set(_TOKEN_RE.findall(query.lower())) if token in doc_freq
+    }
+    if not query_idf or not avg_len:
+        return [0.0] * num_docs
+    
+    scores = []
+    for tokens in doc_tokens:
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        length_norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * len(tokens) / avg_len)
+        score = 0.0
+        for token, token_idf in query_idf.items():
+            tf = counts.get(token)
+            if tf:
+                score += token_idf * tf * (_BM25_K1 + 1) / (tf + length_norm)
+        scores.append(score)
+    
+    max_score = max(scores)
+    if not max_score:
+        return scores
+    return [score / max_score for score in scores]
+
+
 def _calculate_relevance_score(result: Dict[str, Any], dataset_name: str) -> float:
     """计算搜索结果的相关性得分."""
     score = 0.0
@@ -279,28 +494,15 @@ def _calculate_relevance_score(result: Dict[str, Any], dataset_name: str) -> flo
     if dataset_name_lower in snippet:
         score += 2.0
     
-    # 优质来源加分
-    domain_scores = {
-        "github.com": 8.0,
-        "huggingface.co": 7.0,
-        "arxiv.org": 6.0,
-        "paperswithcode.com": 5.0,
-        "kaggle.com": 4.0
-    }
-    
-    for domain, bonus in domain_scores.items():
+    # 优质来源加分 (子串检查均在C层完成，比正则扫描更快)
+    for domain, bonus in _DOMAIN_SCORES.items():
         if domain in url:
             score += bonus
             break
     
     # 相关关键词加分
-    relevant_keywords = [
-        "dataset", "data", "repository", "repo", "license", "citation", 
-        "paper", "benchmark", "collection", "corpus"
-    ]
-    
-    text_to_check = f"{title} {snippet}".lower()
-    for keyword in relevant_keywords:
+    text_to_check = f"{title} {snippet}"
+    for keyword in _RELEVANT_KEYWORDS:
         if keyword in text_to_check:
             score += 1.0
     
@@ -393,24 +595,23 @@ def _is_likely_public_dataset(dataset_name: str, preliminary: Dict[str, Any]) ->
     if not dataset_name:
         return False
     
+    # dict不可哈希，取出描述后交给带缓存的判断函数
+    return _is_likely_public_name(dataset_name, preliminary.get("description", ""))
+
+
+@functools.lru_cache(maxsize=1024)
+def _is_likely_public_name(dataset_name: str, description: str) -> bool:
+    """根据名称和描述判断是否为公开数据集 (结果按参数缓存)."""
     name_lower = dataset_name.lower()
-    description = preliminary.get("description", "").lower()
-    
-    # 知名数据集名称模式
-    public_indicators = [
-        "benchmark", "bench", "eval", "test", "challenge", "competition",
-        "coco", "imagenet", "bert", "glue", "squad", "wiki", "common",
-        "open", "public", "arxiv", "paper", "official"
-    ]
+    description = description.lower()
     
     # 检查名称中的指示词
-    for indicator in public_indicators:
+    for indicator in _PUBLIC_INDICATORS:
         if indicator in name_lower or indicator in description:
             return True
     
     # 检查是否包含版本号或日期(通常表示正式发布)
-    import re
-    if re.search(r'v\d+|version|20\d{2}', name_lower):
+    if _VERSION_RE.search(name_lower):
         return True
     
     return False
\ No newline at end of file
@@ -1,10 +1,12 @@
 """Write outputs node for saving generated documentation."""
 
+import asyncio
 import hashlib
+import os
+import re
 import shutil
-from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import structlog
 import aiofiles
 
@@ -13,6 +15,19 @@ from ..config import Config
 
 logger = structlog.get_logger(__name__)
 
+# 回退分块哈希时每次读取的字节数
+_HASH_CHUNK_SIZE = 1 << 20
+
+# 手动编辑区块标记
+_MANUAL_START_MARKER = "<!-- MANUAL_EDIT_START -->"
+_MANUAL_END_MARKER = "<!-- MANUAL_EDIT_END -->"
+
+# 手动编辑区块 (非贪婪匹配到最近的结束标记)
+_MANUAL_SECTION_RE = re.compile(
+    re.escape(_MANUAL_START_MARKER) + r".*?" + re.escape(_MANUAL_END_MARKER),
+    re.DOTALL
+)
+
 
 async def write_outputs(state: DatasetState, config: Optional[Config] = None) -> Dict[str, Any]:
     """
@@ -64,56 +79,17 @@ async def write_outputs(state: DatasetState, config: Optional[Config] = None) ->
                 "current_step": "write_outputs"
             }
         
-        written_files = []
-        
-        # Process each artifact
-        for format_name, artifact in artifacts.items():
-            filename = artifact["filename"]
-            content = artifact["content"]
-            
-            file_path = dataset_path_obj / filename
-            
-            # Check if file already exists and if backup is needed
-            if file_path.exists():
-                if config.output.backup_existing:
-                    await _backup_existing_file(file_path)
-                
-                # Check if content has changed (idempotent write)
-                if await _content_unchanged(file_path, content):
-                    logger.info(f"File {filename} unchanged, skipping write")
-                    written_files.append({
-                        "filename": filename,
-                        "status": "unchanged",
-                        "path": str(file_path)
-                    })
-                    continue
-            
-            # Write new content
-            try:
-                async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-                    await f.write(content)
-                
-                logger.info(f"Successfully wrote {filename}",
-                           file_size=len(content),
-                           file_path=str(file_path))
-                
-                written_files.append({
-                    "filename": filename,
-                    "status": "written",
-                    "path": str(file_path),
-                    "size": len(content)
-                })
-                
-            except Exception as e:
-                error_msg = f"Failed to write {filename}: {str(e)}"
-                logger.error(error_msg)
-                
-                written_files.append({
-                    "filename": filename,
-                    "status": "failed",
-                    "error": str(e),
-                    "path": str(file_path)
-                })
+        # 预先计算各产物新内容的 (SHA-256, 字节数)，每个产物只编码和哈希一次
+        new_hashes = {
+            format_name: _content_digest(artifact["content"])
+            for format_name, artifact in artifacts.items()
+        }
+        
+        # 各产物的备份、比对与写入互不依赖，并发处理 (gather保持原有顺序)
+        written_files = list(await asyncio.gather(*[
+            _process_one(format_name, artifact, dataset_path_obj, config, new_hashes[format_name])
+            for format_name, artifact in artifacts.items()
+        ]))
         
         # Check if any files were successfully written
         success_count = len([f for f in written_files if f["status"] in ["written", "unchanged"]])
@@ -148,33 +124,124 @@ async def write_outputs(state: DatasetState, config: Optional[Config] = None) ->
         }
 
 
-async def _backup_existing_file(file_path: Path) -> bool:
-    """Create backup of existing file."""
+async def _process_one(
+    format_name: str,
+    artifact: Dict[str, Any],
+    dataset_path_obj: Path,
+    config: Config,
+    new_digest: Tuple[str, int]
+) -> Dict[str, Any]:
+    """处理单个产物：存在性检查、可选备份、内容比对与写入，返回写入记录."""
+    filename = artifact["filename"]
+    content = artifact["content"]
+    
+    file_path = dataset_path_obj / filename
+    new_hash, new_size = new_digest
+    
+    # Check if file already exists and if backup is needed
+    if await asyncio.to_thread(file_path.exists):
+        existing_digest = None
+        if config.output.backup_existing:
+            existing_digest = await _backup_existing_file(file_path)
+        
+        # Check if content has changed (idempotent write)
+        # 备份时已算出现有文件的摘要，直接复用，避免再次读取和哈希
+        if existing_digest is not None:
+            unchanged = existing_digest == new_digest
+        else:
+            unchanged = await _content_unchanged(file_path, new_hash, new_size)
+        
+        if unchanged:
+            logger.info(f"File {filename} unchanged, skipping write")
+            return {
+                "filename": filename,
+                "status": "unchanged",
+                "path": str(file_path)
+            }
+    
+    # Write new content
     try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_name = f"{file_path.stem}.{timestamp}.backup{file_path.suffix}"
-        backup_path = file_path.parent / backup_name
+        # newline='' 关闭换行符转换，使磁盘字节与比对所用的UTF-8编码一致
+        async with aiofiles.open(file_path, 'w', encoding='utf-8', newline='') as f:
+            await f.write(content)
         
-        # Copy file to backup
-        shutil.copy2(file_path, backup_path)
+        logger.info(f"Successfully wrote {filename}",
+                   file_size=len(content),
+                   file_path=str(file_path))
         
-        logger.info(f"Created backup: {backup_name}")
-        return True
+        return {
+            "filename": filename,
+            "status": "written",
+            "path": str(file_path),
+            "size": len(content)
+        }
         
+    except Exception as e:
+        error_msg = f"Failed to write {filename}: {str(e)}"
+        logger.error(error_msg)
+        
+        return {
+            "filename": filename,
+            "status": "failed",
+            "error": str(e),
+            "path": str(file_path)
+        }
+
+
+async def _backup_existing_file(file_path: Path) -> Optional[Tuple[str, int]]:
+    """Create backup of existing file.
+    
+    返回现有文件的 (SHA-256, 字节数) 供内容比对复用；无法读取文件时返回None。
+    """
+    try:
+        existing_digest = await asyncio.to_thread(_file_digest, file_path)
     except Exception as e:
         logger.warning(f"Failed to create backup for {file_path.name}: {str(e)}")
-        return False
+        return None
+    
+    try:
+        # 以内容哈希前缀命名备份，相同内容只备份一次
+        backup_name = f"{file_path.stem}.{existing_digest[0][:8]}.backup{file_path.suffix}"
+        backup_path = file_path.parent / backup_name
+        
+        if await asyncio.to_thread(backup_path.exists):
+            logger.info(f"Backup already exists: {backup_name}")
+        else:
+            # Copy file to backup (在线程中执行，避免阻塞事件循环)
+            await asyncio.to_thread(_fast_copy, file_path, backup_path)
+            logger.info(f"Created backup: {backup_name}")
+        
+    except Exception as e:
+        logger.warning(f"Failed to create backup for {file_path.name}: {str(e)}")
+    
+    return existing_digest
 
 
-async def _content_unchanged(file_path: Path, new_content: str) -> bool:
+def _fast_copy(src: Path, dst: Path) -> None:
+    """复制文件并保留元数据，优先使用内核态 copy_file_range (CoW文件系统上为reflink)."""
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            # 跨文件系统或内核不支持时回退到用户态复制
+            pass
+    
+    shutil.copy2(src, dst)
+
+
+async def _content_unchanged(file_path: Path, new_hash: str, new_size: int) -> bool:
     """Check if file content is unchanged."""
     try:
-        async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-            existing_content = await f.read()
-        
-        # Compare content hashes for efficiency
-        existing_hash = hashlib.sha256(existing_content.encode('utf-8')).hexdigest()
-        new_hash = hashlib.sha256(new_content.encode('utf-8')).hexdigest()
+        # stat与哈希在同一次线程调用中完成；大小不同时返回None，不读取文件
+        existing_hash = await asyncio.to_thread(_sha256_file_if_size, file_path, new_size)
         
         return existing_hash == new_hash
         
@@ -183,42 +250,53 @@ async def _content_unchanged(file_path: Path, new_content: str) -> bool:
         return False
 
 
+def _content_digest(content: str) -> Tuple[str, int]:
+    """计算产物内容的 (SHA-256, UTF-8字节数)."""
+    data = content.encode('utf-8')
+    return hashlib.sha256(data).hexdigest(), len(data)
+
+
+def _sha256_file_if_size(file_path: Path, expected_size: int) -> Optional[str]:
+    """文件大小等于 expected_size 时返回其SHA-256，否则返回None (在线程池中执行)."""
+    # 大小不同必然内容不同，无需读取和哈希
+    if os.stat(file_path).st_size != expected_size:
+        return None
+    
+    # 直接对磁盘字节求哈希，避免整文件解码再编码
+    return _file_digest(file_path)[0]
+
+
+def _file_digest(file_path: Path) -> Tuple[str, int]:
+    """计算文件内容的 (SHA-256, 字节数) (在线程池中执行)."""
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        
+        # Python 3.11+ 使用 hashlib.file_digest，旧版本回退为分块读取
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest(), size
+        
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+        return digest.hexdigest(), size
+
+
 def _preserve_manual_sections(existing_content: str, new_content: str) -> str:
     """Preserve manually edited sections from existing content."""
     # Simple implementation - look for manual comment blocks
     # This could be enhanced with more sophisticated parsing
     
-    manual_start_marker = "<!-- MANUAL_EDIT_START -->"
-    manual_end_marker = "<!-- MANUAL_EDIT_END -->"
-    
-    # Extract manual sections from existing content
-    manual_sections = []
-    
-    start_idx = 0
-    while True:
-        start_pos = existing_content.find(manual_start_marker, start_idx)
-        if start_pos == -1:
-            break
-        
-        end_pos = existing_content.find(manual_end_marker, start_pos)
-        if end_pos == -1:
-            break
-        
-        # Include the markers in the preserved section
-        manual_section = existing_content[start_pos:end_pos + len(manual_end_marker)]
-        manual_sections.append(manual_section)
-        
-        start_idx = end_pos + len(manual_end_marker)
+    # Extract manual sections from existing content (单次线性扫描，包含标记本身)
+    manual_sections = [m.group(0) for m in _MANUAL_SECTION_RE.finditer(existing_content)]
     
     # If no manual sections found, return new content as-is
     if not manual_sections:
         return new_content
     
     # Simple approach: append manual sections at the end
-    result = new_content
-    if manual_sections:
-        result += "\n\n## 手动编辑内容\n\n"
-        for section in manual_sections:
-            result += section + "\n\n"
+    parts = [new_content, "\n\n## 手动编辑内容\n\n"]
+    for section in manual_sections:
+        parts.append(section)
+        parts.append("\n\n")
     
-    return result
\ No newline at end of file
+    return "".join(parts)
@@ -4,36 +4,71 @@
 提取真实的来源、描述、用途等关键信息。
 """
 
+import asyncio
+import concurrent.futures
+import copy
+import mmap
+import os
 import re
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List, Tuple
+import aiofiles
 import structlog
 
 logger = structlog.get_logger(__name__)
 
+# 值清理用的正则
+_LIST_MARKER_RE = re.compile(r'^\s*[-*+]\s*')
+_LINK_RE = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# 文档解析结果缓存 ((数据集路径, 文档指纹) -> 解析结果)，按LRU策略淘汰
+_DOC_INFO_CACHE: "OrderedDict[Tuple[str, Tuple], Dict[str, Any]]" = OrderedDict()
+_DOC_INFO_CACHE_MAXSIZE = 512
+
+# 超过该大小的文档改用mmap逐行扫描，只解码相关段落
+_MMAP_THRESHOLD = 64 * 1024
+
+# str.splitlines 额外识别的换行符 (UTF-8编码)，bytes.splitlines 只识别 \r\n、\r 和 \n
+_EXTRA_LINE_BREAKS_RE = re.compile(rb'[\x0b\x0c\x1c-\x1e]|\xc2\x85|\xe2\x80[\xa8\xa9]')
+
+# 除 \n 外 str.splitlines 识别的全部换行符 (UTF-8编码)，逐个 find 比整体正则扫描快
+_NON_LF_LINE_BREAKS = (
+    b"\r", b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e", b"\xc2\x85", b"\xe2\x80\xa8", b"\xe2\x80\xa9"
+)
+
 
 class DatasetDocumentParser:
     """数据集文档解析器"""
     
     def __init__(self):
-        self.field_patterns = {
+        # 字段 -> 对应的 "## " 标题 (按优先级排列)
+        self.field_headers = {
             # 基础信息
-            "description": [r"## 数据集描述\s*\n\s*(.*?)(?=\n##|\n$)", r"## 描述\s*\n\s*(.*?)(?=\n##|\n$)"],
-            "source_url": [r"## 数据集来源\s*\n\s*(.*?)(?=\n##|\n$)", r"## 来源\s*\n\s*(.*?)(?=\n##|\n$)"],
-            "use_case": [r"## 数据集用途\s*\n\s*(.*?)(?=\n##|\n$)", r"## 用途\s*\n\s*(.*?)(?=\n##|\n$)"],
-            "modality": [r"## 数据模态\s*\n\s*(.*?)(?=\n##|\n$)"],
-            "size": [r"## 大小\s*\n\s*(.*?)(?=\n##|\n$)"],
+            "description": ["数据集描述", "描述"],
+            "source_url": ["数据集来源", "来源"],
+            "use_case": ["数据集用途", "用途"],
+            "modality": ["数据模态"],
+            "size": ["大小"],
             
             # 业务属性
-            "domain": [r"## 赋能专业方向\s*\n\s*(.*?)(?=\n##|\n$)", r"## 专业方向\s*\n\s*(.*?)(?=\n##|\n$)"],
-            "business_direction": [r"## 赋能业务方向\s*\n\s*(.*?)(?=\n##|\n$)", r"## 业务方向\s*\n\s*(.*?)(?=\n##|\n$)"],
-            "business_point": [r"## 赋能业务点\s*\n\s*(.*?)(?=\n##|\n$)", r"## 业务点\s*\n\s*(.*?)(?=\n##|\n$)"],
-            "rating": [r"## 专业评级\s*\n\s*(.*?)(?=\n##|\n$)"],
+            "domain": ["赋能专业方向", "专业方向"],
+            "business_direction": ["赋能业务方向", "业务方向"],
+            "business_point": ["赋能业务点", "业务点"],
+            "rating": ["专业评级"],
             
             # 其他信息
-            "format": [r"## 格式\s*\n\s*(.*?)(?=\n##|\n$)"],
-            "remarks": [r"## 备注\s*\n\s*(.*?)(?=\n##|\n$)"],
-            "sequence": [r"## 序号\s*\n\s*(.*?)(?=\n##|\n$)"]
+            "format": ["格式"],
+            "remarks": ["备注"],
+            "sequence": ["序号"]
+        }
+        
+        # 标题 -> (字段, 优先级)
+        self.header_to_field = {
+            header: (field, index)
+            for field, headers in self.field_headers.items()
+            for index, header in enumerate(headers)
         }
         
         # 字段映射和标准化
@@ -99,30 +134,56 @@ class DatasetDocumentParser:
                         f"{base_name}.MD"
                     ])
         
+        # 一次列出目录，按小写文件名匹配 (README.Md 等任意大小写均可命中)
+        entries: Dict[str, List[str]] = {}
+        try:
+            with os.scandir(dataset_dir) as it:
+                for entry in it:
+                    if entry.is_file():
+                        entries.setdefault(entry.name.lower(), []).append(entry.name)
+        except OSError:
+            return []
+        
+        # 同一小写名下的多个文件，按上面列出的写法优先，其余按名称排序
+        priority = {}
+        for index, filename in enumerate(possible_files):
+            priority.setdefault(filename, index)
+        
         found_docs = []
-        for filename in possible_files:
-            doc_path = dataset_dir / filename
-            if doc_path.exists():
+        for key in dict.fromkeys(filename.lower() for filename in possible_files):
+            names = sorted(entries.get(key, ()), key=lambda name: (priority.get(name, len(priority)), name))
+            for name in names:
+                doc_path = dataset_dir / name
                 found_docs.append(doc_path)
                 logger.debug("找到数据集文档", doc_path=str(doc_path))
         
         return found_docs
     
-    def parse_document(self, doc_path: Path) -> Dict[str, Any]:
+    async def parse_document(self, doc_path: Path) -> Dict[str, Any]:
         """解析单个文档文件"""
         try:
-            with open(doc_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if (await asyncio.to_thread(os.path.getsize, doc_path)) >= _MMAP_THRESHOLD:
+                sections = await asyncio.to_thread(self._split_sections_mmap, doc_path)
+            else:
+                async with aiofiles.open(doc_path, 'r', encoding='utf-8') as f:
+                    content = await f.read()
+                sections = self._split_sections(content)
+            
+            # 按标题切分后查表：每个字段保留优先级最高的标题下的内容
+            matches = {}
+            for header, section in sections.items():
+                target = self.header_to_field.get(header)
+                if target is None:
+                    continue
+                field, index = target
+                current = matches.get(field)
+                if current is None or index < current[0]:
+                    matches[field] = (index, section)
             
             extracted_info = {}
             
-            for field, patterns in self.field_patterns.items():
-                value = None
-                for pattern in patterns:
-                    match = re.search(pattern, content, re.DOTALL | re.MULTILINE)
-                    if match:
-                        value = match.group(1).strip()
-                        break
+            for field in self.field_headers:
+                value = matches[field][1].strip() if field in matches else None
                 
                 if value:
                     # 清理和标准化值
@@ -146,6 +207,79 @@ class DatasetDocumentParser:
                         error=str(e))
             return {}
     
+    def _split_sections(self, content: str) -> Dict[str, str]:
+        """逐行切分文档为 {标题: 内容}
+        
+        内容从 "## 标题" 行之后的首个非空行开始，遇到空行或以 "##" 开头的行结束；
+        同一标题出现多次时保留第一次的内容。
+        """
+        sections = {}
+        header = None
+        lines = []
+        
+        for line in content.splitlines():
+            if line.startswith("## "):
+                if header is not None:
+                    sections.setdefault(header, "\n".join(lines))
+                header = line[3:].strip()
+                lines = []
+            elif header is None:
+                continue
+            elif line.startswith("##") or (lines and not line.strip()):
+                # 段落结束，直到下一个标题前的行都忽略
+                sections.setdefault(header, "\n".join(lines))
+                header = None
+            elif line.strip():
+                lines.append(line)
+        
+        if header is not None:
+            sections.setdefault(header, "\n".join(lines))
+        
+        return sections
+    
+    def _split_sections_mmap(self, doc_path: Path) -> Dict[str, str]:
+        """基于mmap的 _split_sections，用于大文档
+        
+        只解码标题行和已知标题下的内容行，其余字节不做解码；
+        未知标题的段落直接跳过。
+        """
+        sections = {}
+        header = None
+        lines = []
+        
+        with open(doc_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if all(mm.find(sep) == -1 for sep in _NON_LF_LINE_BREAKS):
+                # 只有 \n 换行 (最常见)，直接按 readline 切分
+                raw_lines = iter(mm.readline, b"")
+            else:
+                raw_lines = _iter_lines(mm)
+            
+            for raw in raw_lines:
+                if raw.startswith(b"## "):
+                    if header is not None:
+                        sections.setdefault(header, "\n".join(lines))
+                    header = raw[3:].decode('utf-8').strip()
+                    if header not in self.header_to_field:
+                        header = None
+                    lines = []
+                    continue
+                if header is None:
+                    continue
+                
+                line = raw.decode('utf-8').rstrip("\n")
+                if line.startswith("##") or (lines and not line.strip()):
+                    # 段落结束，直到下一个标题前的行都忽略
+                    sections.setdefault(header, "\n".join(lines))
+                    header = None
+                elif line.strip():
+                    lines.append(line)
+        
+        if header is not None:
+            sections.setdefault(header, "\n".join(lines))
+        
+        return sections
+    
     def _clean_value(self, value: str) -> str:
         """清理提取的值"""
         if not value:
@@ -155,27 +289,28 @@ class DatasetDocumentParser:
         value = value.strip()
         
         # 去除可能的markdown格式
-        value = re.sub(r'^\s*[-*+]\s*', '', value)  # 去除列表符号
-        value = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', value)  # 将链接转为纯文本
+        value = _LIST_MARKER_RE.sub('', value)  # 去除列表符号
+        value = _LINK_RE.sub(r'\1', value)  # 将链接转为纯文本
         
         # 处理换行符
         value = value.replace('\n', ' ').replace('\r', ' ')
-        value = re.sub(r'\s+', ' ', value)  # 合并多个空白为单个空格
+        value = _WHITESPACE_RE.sub(' ', value)  # 合并多个空白为单个空格
         
         return value.strip()
     
-    def parse_dataset_info(self, dataset_path: str) -> Dict[str, Any]:
-        """解析数据集的完整信息"""
-        docs = self.find_dataset_docs(dataset_path)
+    async def parse_dataset_info(self, dataset_path: str, docs: Optional[List[Path]] = None) -> Dict[str, Any]:
+        """解析数据集的完整信息，docs为空时自动查找文档"""
+        if docs is None:
+            docs = self.find_dataset_docs(dataset_path)
         
         if not docs:
             logger.warning("未找到数据集文档", dataset_path=dataset_path)
             return {}
         
-        # 合并所有文档的信息
+        # 并发读取所有文档，按查找顺序合并信息
+        doc_infos = await asyncio.gather(*(self.parse_document(doc_path) for doc_path in docs))
         combined_info = {}
-        for doc_path in docs:
-            doc_info = self.parse_document(doc_path)
+        for doc_info in doc_infos:
             combined_info.update(doc_info)
         
         # 后处理
@@ -220,7 +355,73 @@ class DatasetDocumentParser:
         return info
 
 
+# 共享的解析器实例，模式只编译一次
+_DEFAULT_PARSER = DatasetDocumentParser()
+
+
+async def parse_dataset_documents_async(dataset_path: str) -> Dict[str, Any]:
+    """解析数据集文档的便捷函数 (异步版本，供事件循环内调用)
+    
+    文档未变化 (文件名、修改时间、大小均相同) 时直接返回缓存的解析结果。
+    """
+    docs = _DEFAULT_PARSER.find_dataset_docs(dataset_path)
+    fingerprint = _docs_fingerprint(docs)
+    if fingerprint is None:
+        return await _DEFAULT_PARSER.parse_dataset_info(dataset_path, docs)
+    
+    key = (dataset_path, fingerprint)
+    cached = _DOC_INFO_CACHE.get(key)
+    if cached is not None:
+        _DOC_INFO_CACHE.move_to_end(key)
+        return copy.deepcopy(cached)
+    
+    info = await _DEFAULT_PARSER.parse_dataset_info(dataset_path, docs)
+    _DOC_INFO_CACHE[key] = copy.deepcopy(info)
+    if len(_DOC_INFO_CACHE) > _DOC_INFO_CACHE_MAXSIZE:
+        _DOC_INFO_CACHE.popitem(last=False)
+    return info
+
+
+def _iter_lines(mm: mmap.mmap) -> Iterator[bytes]:
+    """按 str.splitlines 的规则逐行产出字节内容 (不含换行符)，与小文档的切分方式一致"""
+    for raw in iter(mm.readline, b""):
+        if _EXTRA_LINE_BREAKS_RE.search(raw):
+            # 含Unicode换行符的行较少见，解码后按字符串规则切分
+            for line in raw.decode('utf-8').splitlines():
+                yield line.encode('utf-8')
+        else:
+            yield from raw.splitlines()
+
+
+def _docs_fingerprint(docs: List[Path]) -> Optional[Tuple]:
+    """基于文件名、修改时间和大小生成文档指纹，读取失败时返回None"""
+    try:
+        fingerprint = []
+        for doc_path in docs:
+            stat = doc_path.stat()
+            fingerprint.append((doc_path.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(fingerprint)
+    except OSError:
+        return None
+
+
+def cache_clear() -> None:
+    """清空文档解析结果缓存"""
+    _DOC_INFO_CACHE.clear()
+
+
 def parse_dataset_documents(dataset_path: str) -> Dict[str, Any]:
-    """解析数据集文档的便捷函数"""
-    parser = DatasetDocumentParser()
-    return parser.parse_dataset_info(dataset_path)
\ No newline at end of file
+    """解析数据集文档的便捷函数 (同步版本)
+    
+    可在任意上下文中调用。若当前线程已有运行中的事件循环 (如notebook、
+    异步调用方)，则在独立线程中运行解析并阻塞等待结果，与原同步实现的
+    行为一致；异步代码中应优先 await parse_dataset_documents_async。
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(parse_dataset_documents_async(dataset_path))
+    
+    # asyncio.run 不能嵌套在运行中的事件循环内，改在独立线程中执行
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, parse_dataset_documents_async(dataset_path)).result()
\ No newline at end of file